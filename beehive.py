@@ -1,5 +1,6 @@
+from __future__ import annotations
 from dataclasses import dataclass
-from heap import MaxHeap
+from heap import MaxHeap, top_k_across
 
 @dataclass
 class Beehive:
@@ -18,18 +19,71 @@ class BeehiveSelector:
     def __init__(self, max_beehives: int):
         self.our_adt = MaxHeap(max_beehives)
 
-    def set_all_beehives(self, hive_list: list[Beehive]):
-        new_adt = MaxHeap(len(hive_list))
-        for hive in hive_list: # O(M)
-            new_adt.add(hive)
+    def set_all_beehives(self, hive_list: list[Beehive], capacity: int = 0):
+        """ Replaces the beehives with hive_list. They are copied in as a block and
+        heapified bottom-up, instead of being added one by one. capacity reserves
+        room for more beehives to be added later.
+        Complexity: O(M + capacity)
+        """
+        new_adt = MaxHeap(max(len(hive_list), capacity))
+        new_adt.the_array[1:len(hive_list) + 1] = hive_list
+        new_adt.length = len(hive_list)
+        new_adt.heapify()
         self.our_adt = new_adt
 
+    def beehives(self) -> list[Beehive]:
+        """ Returns the beehives, in no particular order.
+        Complexity: O(M)
+        """
+        return self.our_adt.the_array[1:self.our_adt.length + 1]
+
+    def __len__(self) -> int:
+        return len(self.our_adt)
+
     def add_beehive(self, hive: Beehive):
         self.our_adt.add(hive)
     
     def harvest_best_beehive(self):
-        popped_hive = self.our_adt.get_max()
-        harvested_value = min(popped_hive.capacity, popped_hive.volume)*popped_hive.nutrient_factor
-        popped_hive.volume = max(0, popped_hive.volume - popped_hive.capacity)
-        self.our_adt.add(popped_hive)
+        """ Harvests the best beehive. Harvesting can only lower its value, so it is
+        updated in place at the root and sunk, instead of being popped and re-added.
+        Complexity: O(log M) where M is the number of beehives
+        """
+        best_hive = self.our_adt.peek_max()
+        harvested_value = min(best_hive.capacity, best_hive.volume)*best_hive.nutrient_factor
+        best_hive.volume = max(0, best_hive.volume - best_hive.capacity)
+        self.our_adt.sink(1)
         return harvested_value
+
+    def harvest_many(self, n: int) -> list[int]:
+        """ Harvests the best beehive n times in a row.
+        Complexity: O(n log M)
+        """
+        return [self.harvest_best_beehive() for _ in range(n)]
+
+    def peek_best_beehive(self) -> Beehive:
+        """ Returns the beehive harvest_best_beehive would pick next, without harvesting it.
+        Complexity: O(1)
+        """
+        return self.our_adt.peek_max()
+
+    def top_k(self, k: int) -> list[Beehive]:
+        """ Returns the k best beehives, best first, without changing the selector.
+        Complexity: O(k log k), see MaxHeap.top_k
+        """
+        return self.our_adt.top_k(k)
+
+    def meld(self, other: BeehiveSelector):
+        """ Moves every beehive of another selector into this one, leaving that
+        selector empty: harvesting a beehive here lowers its volume, which the other
+        selector's heap would not see.
+        Complexity: O(N + M), see MaxHeap.meld
+        """
+        self.our_adt.meld(other.our_adt)
+
+
+def top_k_beehives(selectors: list[BeehiveSelector], k: int) -> list[Beehive]:
+    """ Returns the k best beehives over all the selectors, best first, without
+    changing any of them.
+    Complexity: O(S + k log(S + k)) where S is the number of selectors
+    """
+    return top_k_across([selector.our_adt for selector in selectors], k)
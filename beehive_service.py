@@ -0,0 +1,108 @@
+""" Concurrency-safe front-ends for BeehiveSelector.
+    LockedBeehiveSelector serialises callers from many threads with a lock.
+    AsyncBeehiveSelector serves asyncio tasks, coalescing the harvest requests
+    that arrive within a short window into one batch under a single lock hold.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from beehive import Beehive, BeehiveSelector
+
+
+class LockedBeehiveSelector:
+    """ Thread-safe wrapper: every operation runs under one lock, so a harvest
+    can never interleave with another harvest or with an update of the heap. """
+
+    def __init__(self, selector: BeehiveSelector):
+        self.selector = selector
+        self.lock = threading.Lock()
+
+    def set_all_beehives(self, hive_list: list[Beehive]):
+        with self.lock:
+            self.selector.set_all_beehives(hive_list)
+
+    def add_beehive(self, hive: Beehive):
+        with self.lock:
+            self.selector.add_beehive(hive)
+
+    def harvest_best_beehive(self) -> int:
+        with self.lock:
+            return self.selector.harvest_best_beehive()
+
+    def harvest_many(self, n: int) -> list[int]:
+        """ Harvests n times under a single lock hold. """
+        with self.lock:
+            return self.selector.harvest_many(n)
+
+    def peek_best_beehive(self) -> Beehive:
+        with self.lock:
+            return self.selector.peek_best_beehive()
+
+    def top_k(self, k: int) -> list[Beehive]:
+        with self.lock:
+            return self.selector.top_k(k)
+
+
+class AsyncBeehiveSelector:
+    """ asyncio front-end with request coalescing.
+    Harvest requests are queued and answered together window seconds after the
+    first one of a batch arrives. Each request receives its own harvested value,
+    in arrival order. The lock is shared with a LockedBeehiveSelector, so
+    threaded and asyncio callers can use the same selector. The locked sections
+    run in the loop's default executor, so a thread holding the lock for long
+    never blocks the event loop.
+    """
+
+    def __init__(self, selector: BeehiveSelector | LockedBeehiveSelector, window: float = 0.001):
+        if not isinstance(selector, LockedBeehiveSelector):
+            selector = LockedBeehiveSelector(selector)
+        self.locked = selector
+        self.window = window
+        self.pending = []
+        self.flush_handle = None
+        # batches reach the selector one at a time, in the order they were flushed
+        self.batch_lock = asyncio.Lock()
+        self.batches = set()
+
+    async def add_beehive(self, hive: Beehive):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.locked.add_beehive, hive)
+
+    async def harvest_best_beehive(self) -> int:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append(future)
+        if self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        """ Hands every queued harvest request over to one batch of heap operations.
+        Requests cancelled while waiting are dropped without harvesting.
+        """
+        self.flush_handle = None
+        pending = [future for future in self.pending if not future.cancelled()]
+        self.pending = []
+        if not pending:
+            return
+        batch = asyncio.ensure_future(self.harvest_batch(pending))
+        # the loop only keeps weak references to its tasks
+        self.batches.add(batch)
+        batch.add_done_callback(self.batches.discard)
+
+    async def harvest_batch(self, pending: list[asyncio.Future]):
+        """ Harvests once per request under a single lock hold, off the event loop. """
+        loop = asyncio.get_running_loop()
+        async with self.batch_lock:
+            try:
+                values = await loop.run_in_executor(None, self.locked.harvest_many, len(pending))
+            except Exception as e:
+                for future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        for future, value in zip(pending, values):
+            if not future.done():
+                future.set_result(value)
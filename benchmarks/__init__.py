@@ -0,0 +1,12 @@
+""" Scaling benchmarks for the data structures in this repository.
+
+    python -m benchmarks run --out results.json
+    python -m benchmarks compare baseline.json results.json
+    python -m benchmarks startup --out startup.json
+
+Every case is measured at each size under random, sorted and adversarial
+input orders; see benchmarks.cases for what is measured and
+benchmarks.suite for how runs are timed, saved and compared. The startup
+command times cold imports instead (see benchmarks.startup); its results can be
+compared the same way.
+"""
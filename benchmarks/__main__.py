@@ -0,0 +1,84 @@
+import argparse
+import fnmatch
+import sys
+
+from benchmarks.cases import CASES, ORDERS
+from benchmarks.suite import SIZES, OK, run_suite, save, load, compare
+from benchmarks.startup import DEFERRED, run_startup
+
+
+def print_result(r):
+    if r["status"] == OK:
+        print("{case:32} {order:12} n={n:<8} {seconds:9.4f}s {per_op:.3e}s/op".format(**r), flush=True)
+    else:
+        print("{case:32} {order:12} n={n:<8} {status}: {reason}".format(**r), flush=True)
+
+
+def print_comparison(rows):
+    for row in rows:
+        change = "" if row["change"] is None else "{0:+7.1%}".format(row["change"])
+        print("{case:32} {order:12} n={n:<8} {0:8} {verdict}".format(change, **row))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="measure the cases and save the results")
+    run.add_argument("-o", "--out", default="benchmarks.json", help="where to save the JSON results")
+    run.add_argument("-c", "--cases", nargs="*", default=["*"], help="glob patterns of the cases to run")
+    run.add_argument("--orders", nargs="*", default=list(ORDERS), choices=ORDERS)
+    run.add_argument("-n", "--sizes", nargs="*", type=int, default=list(SIZES))
+    run.add_argument("-r", "--repeat", type=int, default=3, help="keep the best of this many runs")
+    run.add_argument("--budget", type=float, default=30.0,
+                     help="seconds one size may take, measured or estimated, before the larger sizes are skipped")
+    run.add_argument("--seed", type=int, default=0)
+
+    cmp = commands.add_parser("compare", help="flag regressions between two saved runs")
+    cmp.add_argument("old")
+    cmp.add_argument("new")
+    cmp.add_argument("-t", "--threshold", type=float, default=0.1,
+                     help="relative slowdown per operation that counts as a regression")
+    cmp.add_argument("--noise", type=float, default=0.001,
+                     help="ignore measurements that took less than this many seconds")
+    cmp.add_argument("-a", "--all", action="store_true", help="also list unchanged measurements")
+
+    startup = commands.add_parser("startup", help="time cold imports and check that heavy imports are deferred")
+    startup.add_argument("modules", nargs="*", default=list(DEFERRED))
+    startup.add_argument("-o", "--out", default="startup.json", help="where to save the JSON results")
+    startup.add_argument("-r", "--repeat", type=int, default=5, help="keep the best of this many imports")
+
+    commands.add_parser("list", help="list the cases")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        print("\n".join(CASES))
+        return 0
+
+    if args.command == "startup":
+        results, problems = run_startup(args.modules, args.repeat)
+        for r in results["results"]:
+            print("{0:32} {1:8.2f}ms {2} modules".format(r["case"], r["seconds"] * 1000, len(r["loaded"])))
+        for problem in problems:
+            print("FAIL: " + problem)
+        save(results, args.out)
+        print("Saved {0} results to {1}".format(len(results["results"]), args.out))
+        return 1 if problems else 0
+
+    if args.command == "run":
+        names = [name for name in CASES if any(fnmatch.fnmatch(name, p) for p in args.cases)]
+        results = run_suite(names, args.orders, args.sizes, args.repeat, args.budget, args.seed, print_result)
+        save(results, args.out)
+        print("Saved {0} results to {1}".format(len(results["results"]), args.out))
+        return 0
+
+    rows = compare(load(args.old), load(args.new), args.threshold, args.noise)
+    print_comparison(rows if args.all else [row for row in rows if row["verdict"] != "ok"])
+    regressions = sum(row["verdict"] == "regression" for row in rows)
+    print("{0} regressions, {1} improvements out of {2} measurements".format(
+        regressions, sum(row["verdict"] == "improvement" for row in rows), len(rows)))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
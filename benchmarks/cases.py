@@ -0,0 +1,226 @@
+""" Benchmark cases.
+    A case takes a size n, an input order and a random generator, does its
+    setup and returns (run, ops): run is the zero-argument operation to time
+    and ops the number of operations it performs, so that results can be
+    compared per operation across sizes.
+"""
+from __future__ import annotations
+
+from random import Random
+from typing import Callable, Dict, List, Tuple
+
+from balancing import make_ordering
+from beehive import Beehive, BeehiveSelector
+from bst import BinarySearchTree
+from heap import MaxHeap
+from ratio import Percentiles
+from threedeebeetree import ThreeDeeBeeTree, Point
+from treesort import treesort, parallel_treesort
+
+Case = Callable[[int, str, Random], Tuple[Callable[[], object], int]]
+
+# random: a shuffle; sorted: ascending;
+# adversarial: alternating extremes 0, n-1, 1, n-2, ... which builds a
+# degenerate zigzag in an unbalanced BST and a diagonal chain in a 3DBT
+ORDERS = ("random", "sorted", "adversarial")
+
+# ratio(x, y) keeps the middle 100 - x - y percent of the points
+WINDOW_WIDTHS = (1, 10, 50, 90)
+
+# caps the number of queries of the cases whose single query is cheap
+MAX_QUERIES = 10000
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str):
+    """ Registers the decorated function as the case called name. """
+    def register(func: Case) -> Case:
+        CASES[name] = func
+        return func
+    return register
+
+
+def keys_in_order(n: int, order: str, rng: Random) -> List[int]:
+    """ Returns the integers 0 to n - 1 in the given order. """
+    if order == "random":
+        return rng.sample(range(n), n)
+    if order == "sorted":
+        return list(range(n))
+    if order == "adversarial":
+        return [i // 2 if i % 2 == 0 else n - 1 - i // 2 for i in range(n)]
+    raise ValueError("Unknown order: {0}".format(order))
+
+
+def points_in_order(n: int, order: str, rng: Random) -> List[Point]:
+    """ Returns n distinct points of the cube [0, n)^3 in the given order. """
+    if order == "adversarial":
+        return [(i, i, i) for i in range(n)]
+    points = [(c // (n * n), c // n % n, c % n) for c in rng.sample(range(n ** 3), n)]
+    if order == "sorted":
+        points.sort()
+    elif order != "random":
+        raise ValueError("Unknown order: {0}".format(order))
+    return points
+
+
+def beehives_in_order(n: int, order: str, rng: Random) -> List[Beehive]:
+    """ Returns n beehives whose values follow the key order; a harvest empties a hive. """
+    return [Beehive(v, 0, 0, capacity=v + 1, nutrient_factor=1, volume=v + 1)
+            for v in keys_in_order(n, order, rng)]
+
+
+def build_tree(keys: List[int]) -> BinarySearchTree:
+    tree = BinarySearchTree()
+    for key in keys:
+        tree[key] = key
+    return tree
+
+
+def build_3dbt(points: List[Point]) -> ThreeDeeBeeTree:
+    tree = ThreeDeeBeeTree()
+    for point in points:
+        tree[point] = point
+    return tree
+
+
+@case("bst.insert")
+def bst_insert(n: int, order: str, rng: Random):
+    keys = keys_in_order(n, order, rng)
+    return (lambda: build_tree(keys)), n
+
+
+@case("bst.lookup")
+def bst_lookup(n: int, order: str, rng: Random):
+    tree = build_tree(keys_in_order(n, order, rng))
+    queries = rng.sample(range(n), n)
+
+    def run():
+        for key in queries:
+            tree[key]
+    return run, n
+
+
+@case("bst.delete")
+def bst_delete(n: int, order: str, rng: Random):
+    tree = build_tree(keys_in_order(n, order, rng))
+    queries = rng.sample(range(n), n)
+
+    def run():
+        for key in queries:
+            del tree[key]
+    return run, n
+
+
+@case("bst.kth_smallest")
+def bst_kth_smallest(n: int, order: str, rng: Random):
+    tree = build_tree(keys_in_order(n, order, rng))
+    ranks = [rng.randint(1, n) for _ in range(min(n, MAX_QUERIES))]
+
+    def run():
+        for k in ranks:
+            tree.kth_smallest(k, tree.root)
+    return run, len(ranks)
+
+
+def percentiles_ratio(width: int) -> Case:
+    x = (100 - width) / 2
+
+    def percentiles_case(n: int, order: str, rng: Random):
+        percentiles = Percentiles()
+        for key in keys_in_order(n, order, rng):
+            percentiles.add_point(key)
+        queries = 100
+
+        def run():
+            for _ in range(queries):
+                percentiles.ratio(x, x)
+        return run, queries
+    return percentiles_case
+
+
+for width in WINDOW_WIDTHS:
+    case("percentiles.ratio[w={0}]".format(width))(percentiles_ratio(width))
+
+
+@case("heap.add")
+def heap_add(n: int, order: str, rng: Random):
+    hives = beehives_in_order(n, order, rng)
+
+    def run():
+        heap = MaxHeap(n)
+        for hive in hives:
+            heap.add(hive)
+    return run, n
+
+
+@case("heap.get_max")
+def heap_get_max(n: int, order: str, rng: Random):
+    heap = MaxHeap(n)
+    for hive in beehives_in_order(n, order, rng):
+        heap.add(hive)
+
+    def run():
+        for _ in range(n):
+            heap.get_max()
+    return run, n
+
+
+@case("beehive.harvest")
+def beehive_harvest(n: int, order: str, rng: Random):
+    selector = BeehiveSelector(n)
+    for hive in beehives_in_order(n, order, rng):
+        selector.add_beehive(hive)
+
+    def run():
+        for _ in range(n):
+            selector.harvest_best_beehive()
+    return run, n
+
+
+@case("3dbt.insert")
+def threedeebeetree_insert(n: int, order: str, rng: Random):
+    points = points_in_order(n, order, rng)
+    return (lambda: build_3dbt(points)), n
+
+
+@case("3dbt.lookup")
+def threedeebeetree_lookup(n: int, order: str, rng: Random):
+    points = points_in_order(n, order, rng)
+    tree = build_3dbt(points)
+    queries = rng.sample(points, n)
+
+    def run():
+        for point in queries:
+            tree[point]
+    return run, n
+
+
+@case("3dbt.insert+make_ordering")
+def threedeebeetree_insert_balanced(n: int, order: str, rng: Random):
+    points = make_ordering(points_in_order(n, order, rng))
+    return (lambda: build_3dbt(points)), n
+
+
+@case("3dbt.lookup+make_ordering")
+def threedeebeetree_lookup_balanced(n: int, order: str, rng: Random):
+    points = make_ordering(points_in_order(n, order, rng))
+    tree = build_3dbt(points)
+    queries = rng.sample(points, n)
+
+    def run():
+        for point in queries:
+            tree[point]
+    return run, n
+
+
+@case("treesort")
+def treesort_case(n: int, order: str, rng: Random):
+    keys = keys_in_order(n, order, rng)
+    return (lambda: treesort(keys)), n
+
+
+@case("treesort.parallel")
+def parallel_treesort_case(n: int, order: str, rng: Random):
+    keys = keys_in_order(n, order, rng)
+    return (lambda: list(parallel_treesort(keys))), n
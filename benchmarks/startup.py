@@ -0,0 +1,79 @@
+""" Cold-start import benchmark.
+    Each entry module is imported in a fresh interpreter under -X importtime,
+    which reports the time spent loading every module. The results are saved in
+    the same format as the scaling suite, so that compare flags slower startups.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from benchmarks.suite import FORMAT_VERSION, OK
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# entry modules, and the modules they should only load once they are used
+DEFERRED = {
+    "bst": ("ctypes",),
+    "ratio": ("ctypes", "kll"),
+    "treesort": ("ctypes", "concurrent.futures"),
+    "heap": ("ctypes",),
+    "beehive": ("ctypes",),
+    "threedeebeetree": ("array", "multiprocessing"),
+    "morton": ("array", "multiprocessing"),
+    "ed_utils.timeout": ("multiprocessing", "ed_utils.json_test_runner"),
+}
+
+
+def import_profile(module: str) -> Dict[str, int]:
+    """
+    Imports module in a fresh interpreter and returns the cumulative import
+    time, in microseconds, of every module it loaded. Bytecode is cached, as
+    it would be in a deployed checkout, so compiling the sources is not timed
+    after the first call.
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    done = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if done.returncode != 0:
+        raise ImportError("Could not import {0}:\n{1}".format(module, done.stderr))
+    profile = {}
+    for line in done.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def eager_imports(module: str, profile: Dict[str, int]) -> List[str]:
+    """ Returns the modules that importing module loaded although they should be deferred. """
+    return [name for name in DEFERRED.get(module, ()) if name in profile]
+
+
+def run_startup(modules: Iterable[str] = DEFERRED, repeat: int = 5) -> Tuple[dict, List[str]]:
+    """
+    Times the import of each module, keeping the best of repeat fresh interpreters
+    after one warm-up import that caches the bytecode.
+    Returns the run and a description of every deferred module loaded eagerly.
+    """
+    results, problems = [], []
+    for module in modules:
+        import_profile(module)
+        best = min(import_profile(module)[module] for _ in range(repeat)) / 1e6
+        profile = import_profile(module)
+        for name in eager_imports(module, profile):
+            problems.append("{0} imports {1} eagerly".format(module, name))
+        results.append({"case": "import " + module, "order": "cold", "n": 1, "status": OK,
+                        "ops": 1, "seconds": best, "per_op": best, "loaded": sorted(profile)})
+    run = {
+        "version": FORMAT_VERSION,
+        "meta": {"python": sys.version.split()[0], "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "repeat": repeat},
+        "results": results,
+    }
+    return run, problems
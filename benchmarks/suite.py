@@ -0,0 +1,188 @@
+""" Runs the benchmark cases, saves the results as JSON and compares two runs. """
+from __future__ import annotations
+
+import gc
+import json
+import math
+import platform
+import sys
+import time
+from random import Random
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from benchmarks.cases import CASES, ORDERS
+
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+FORMAT_VERSION = 1
+
+# stack frames allowed per key, in case a recursive helper takes more than one
+# frame per level of a degenerate tree
+RECURSION_PER_KEY = 2
+
+# growth exponent assumed for a case measured at a single size so far: the
+# slowest cases of the suite (sorted inserts into an unbalanced tree) are quadratic
+DEFAULT_EXPONENT = 2.0
+
+# statuses of a result
+OK = "ok"
+ERROR = "error"
+SKIPPED = "skipped"
+
+
+def measure(name: str, n: int, order: str, repeat: int, seed: int,
+            budget: float = float("inf")) -> Tuple[dict, float]:
+    """
+    Times case name at size n, keeping the best of repeat runs on the same input.
+    No further runs are started once budget seconds have been spent.
+    Returns the result and the wall time spent, setup included.
+    The recursion limit is raised to cover a degenerate tree of n nodes, so
+    sorted and adversarial orders are timed rather than failing outright.
+    A case that raises NotImplementedError is skipped; any other exception is
+    recorded as an error.
+    """
+    result = {"case": name, "order": order, "n": n}
+    best = None
+    start = time.perf_counter()
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, RECURSION_PER_KEY * n + 1000))
+    try:
+        for _ in range(repeat):
+            run, ops = CASES[name](n, order, Random(seed))
+            gc.collect()
+            gc.disable()
+            try:
+                t = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - t
+            finally:
+                gc.enable()
+            best = elapsed if best is None else min(best, elapsed)
+            if time.perf_counter() - start > budget:
+                break
+    except NotImplementedError:
+        result.update(status=SKIPPED, reason="not implemented")
+    except Exception as e:
+        result.update(status=ERROR, reason="{0}: {1}".format(type(e).__name__, e))
+    else:
+        result.update(status=OK, ops=ops, seconds=best, per_op=best / ops)
+    finally:
+        sys.setrecursionlimit(limit)
+    return result, time.perf_counter() - start
+
+
+def estimate(history: List[Tuple[int, float, float]], n: int) -> float:
+    """
+    Predicts the wall time a measurement at size n will take from the
+    (size, timed seconds, wall seconds) of the previous sizes: the last wall time
+    is scaled by the growth of the timed runs between the last two sizes (at least
+    linear, DEFAULT_EXPONENT when there is only one size). The timed runs give the
+    growth because the wall time also holds a fixed cost (setup, gc.collect).
+    """
+    n1, t1, wall = history[-1]
+    exponent = DEFAULT_EXPONENT
+    if len(history) > 1:
+        n0, t0, _ = history[-2]
+        if t0 > 0 and t1 > 0:
+            exponent = max(1.0, math.log(t1 / t0) / math.log(n1 / n0))
+    return wall * (n / n1) ** exponent
+
+
+def run_suite(names: Iterable[str] | None = None, orders: Iterable[str] = ORDERS,
+              sizes: Iterable[int] = SIZES, repeat: int = 3, budget: float = 30.0,
+              seed: int = 0, log: Callable[[dict], None] | None = None) -> dict:
+    """
+    Measures every case under every order at every size, smallest size first.
+    Once a (case, order) pair has spent more than budget seconds on one size, or
+    failed, its larger sizes are recorded as skipped instead of being run.
+    A size is also skipped, along with the larger ones, when the time of the last
+    size scaled by the growth seen so far would overrun the budget, since a
+    measurement cannot be stopped once started.
+    log, if given, is called with each result as soon as it is known.
+    """
+    names = list(CASES) if names is None else list(names)
+    sizes = sorted(sizes)
+    results = []
+    for name in names:
+        for order in orders:
+            stop = None
+            history = []
+            for n in sizes:
+                if stop is None and history and estimate(history, n) > budget:
+                    stop = "n={0} estimated at {1:.3g}s, over the {2}s budget".format(n, estimate(history, n), budget)
+                if stop is not None:
+                    result = {"case": name, "order": order, "n": n, "status": SKIPPED, "reason": stop}
+                else:
+                    result, spent = measure(name, n, order, repeat, seed, budget)
+                    if result["status"] != OK:
+                        stop = "n={0} {1}".format(n, result["status"])
+                    elif spent > budget:
+                        stop = "n={0} over the {1}s budget".format(n, budget)
+                    else:
+                        history.append((n, result["seconds"], spent))
+                results.append(result)
+                if log is not None:
+                    log(result)
+    return {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def save(run: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        run = json.load(f)
+    if run.get("version") != FORMAT_VERSION:
+        raise ValueError("{0} is not a version {1} benchmark file".format(path, FORMAT_VERSION))
+    return run
+
+
+def compare(old: dict, new: dict, threshold: float = 0.1, noise: float = 0.0) -> List[dict]:
+    """
+    Matches the results of two runs by case, order and size.
+    A measurement is a regression when its time per operation grew by more than
+    threshold (0.1 is 10%), and an improvement when it shrank by as much.
+    Measurements that took less than noise seconds in both runs are never flagged.
+    A measurement that used to succeed and now fails is also a regression.
+    """
+    def by_key(run: dict) -> Dict[tuple, dict]:
+        return {(r["case"], r["order"], r["n"]): r for r in run["results"]}
+
+    before, after = by_key(old), by_key(new)
+    rows = []
+    for key in list(before) + [k for k in after if k not in before]:
+        a, b = before.get(key), after.get(key)
+        row = {"case": key[0], "order": key[1], "n": key[2], "old": None, "new": None, "change": None}
+        if a is None or b is None:
+            row["verdict"] = "new" if a is None else "missing"
+        elif a["status"] != OK or b["status"] != OK:
+            if a["status"] == OK:
+                row["verdict"] = "regression"
+            elif b["status"] == OK:
+                row["verdict"] = "fixed"
+            else:
+                row["verdict"] = b["status"]
+        else:
+            row.update(old=a["per_op"], new=b["per_op"], change=b["per_op"] / a["per_op"] - 1)
+            if max(a["seconds"], b["seconds"]) < noise:
+                row["verdict"] = "ok"
+            elif row["change"] > threshold:
+                row["verdict"] = "regression"
+            elif row["change"] < -threshold:
+                row["verdict"] = "improvement"
+            else:
+                row["verdict"] = "ok"
+        rows.append(row)
+    return rows
@@ -8,29 +8,48 @@ from __future__ import annotations
 __author__ = 'Brendon Taylor, modified by Alexey Ignatiev, further modified by Jackson Goerner'
 __docformat__ = 'reStructuredText'
 
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Tuple, Iterable, Iterator, Callable
 from node import TreeNode
+from copy import copy
+from bisect import bisect_right
 import sys
 
-from referential_array import ArrayR
 
 # generic types
 K = TypeVar('K')
 I = TypeVar('I')
 T = TypeVar('T')
 
+# what a tree does when a key is inserted again
+DUPLICATES_ERROR = 'error'      # raise ValueError
+DUPLICATES_REPLACE = 'replace'  # overwrite the item
+DUPLICATES_COUNT = 'count'      # keep the latest item, count the key once more
+DUPLICATES_LIST = 'list'        # the item is a list of every inserted item
+DUPLICATE_POLICIES = (DUPLICATES_ERROR, DUPLICATES_REPLACE, DUPLICATES_COUNT, DUPLICATES_LIST)
+
 
 class BinarySearchTree(Generic[K, I]):
     """ Basic binary search tree. """
 
-    def __init__(self) -> None:
+    # read-only trees cannot be emptied by join and merge
+    read_only = False
+    # persistent trees share their nodes with snapshots, and copy them before a write
+    persistent = False
+
+    def __init__(self, duplicates: str = DUPLICATES_ERROR) -> None:
         """
             Initialises an empty Binary Search Tree
+            duplicates is one of DUPLICATE_POLICIES. Under 'count' and 'list' the tree
+            is a multiset: each node carries the multiplicity of its key, and
+            subtree_size, len() and the order statistics count every copy.
             :complexity: O(1)
         """
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError('Unknown duplicates policy: {0}'.format(duplicates))
 
         self.root = None
         self.length = 0
+        self.duplicates = duplicates
 
     def is_empty(self) -> bool:
         """
@@ -40,7 +59,7 @@ class BinarySearchTree(Generic[K, I]):
         return self.root is None
 
     def __len__(self) -> int:
-        """ Returns the number of nodes in the tree. """
+        """ Returns the number of keys in the tree, counting repeated keys. """
 
         return self.length
 
@@ -59,6 +78,7 @@ class BinarySearchTree(Generic[K, I]):
     def __getitem__(self, key: K) -> I:
         """
             Attempts to get an item in the tree, it uses the Key to attempt to find it
+            (under the 'list' policy, the list of items inserted with the key)
             :complexity best: O(CompK) finds the item in the root of the tree
             :complexity worst: O(CompK * D) item is not found, where D is the depth of the tree
             CompK is the complexity of comparing the keys
@@ -91,24 +111,38 @@ class BinarySearchTree(Generic[K, I]):
         """
 
         if current is None:  # base case: at the leaf
-            current = TreeNode(key, item=item)
+            current = TreeNode(key, item=[item] if self.duplicates == DUPLICATES_LIST else item)
             self.length += 1
 
         elif key < current.key:
-            # print("GOING LEFT")
-            current.subtree_size += 1
             current.left = self.insert_aux(current.left, key, item)
 
         elif key > current.key:
-            # print("GOING RIGHT")
-            current.subtree_size += 1
             current.right = self.insert_aux(current.right, key, item)
 
         else:  # key == current.key
-            raise ValueError('Inserting duplicate item')
-        # print("I AM {} WITH SIZE {}".format(current, current.subtree_size))
+            self.insert_duplicate(current, item)
+        # sizes are only adjusted once the insertion below has succeeded
+        current.subtree_size = size(current.left) + size(current.right) + current.count
         return current
 
+    def insert_duplicate(self, current: TreeNode, item: I) -> None:
+        """
+            Applies the duplicates policy to a node whose key is inserted again.
+            :complexity: O(1)
+        """
+        if self.duplicates == DUPLICATES_ERROR:
+            raise ValueError('Inserting duplicate item')
+        elif self.duplicates == DUPLICATES_REPLACE:
+            current.item = item
+        else:
+            if self.duplicates == DUPLICATES_LIST:
+                current.item.append(item)
+            else:
+                current.item = item
+            current.count += 1
+            self.length += 1
+
     def __delitem__(self, key: K) -> None:
         self.root = self.delete_aux(self.root, key)
 
@@ -121,31 +155,48 @@ class BinarySearchTree(Generic[K, I]):
         if current is None:  # key not found
             raise ValueError('Deleting non-existent item')
         elif key < current.key:
-            current.subtree_size -= 1
             current.left  = self.delete_aux(current.left, key)
         elif key > current.key:
-            current.subtree_size -= 1
             current.right = self.delete_aux(current.right, key)
         else:  # we found our key => do actual deletion
-            current.subtree_size -= 1
-            if self.is_leaf(current):
-                self.length -= 1
-                return None
+            self.length -= 1
+            if current.count > 1:  # only one copy of a repeated key goes
+                self.delete_duplicate(current)
             elif current.left is None:
-                self.length -= 1
                 return current.right
             elif current.right is None:
-                self.length -= 1
                 return current.left
+            else:
+                # general case => move the successor node up
+                succ = self.get_successor(current)
+                current.key  = succ.key
+                current.item = succ.item
+                current.count = succ.count
+                current.right = self.delete_minimal_aux(current.right)
+
+        # sizes are only adjusted once the deletion below has succeeded
+        current.subtree_size = size(current.left) + size(current.right) + current.count
+        return current
 
-            # general case => find a successor
-            succ = self.get_successor(current)
-            current.key  = succ.key
-            current.item = succ.item
-            current.right = self.delete_aux(current.right, succ.key)
-
-
+    def delete_duplicate(self, current: TreeNode) -> None:
+        """
+            Removes one copy of a repeated key (the oldest item under the 'list' policy).
+            :complexity: O(1) amortised
+        """
+        current.count -= 1
+        if self.duplicates == DUPLICATES_LIST:
+            current.item.pop(0)
 
+    def delete_minimal_aux(self, current: TreeNode) -> TreeNode | None:
+        """
+            Unlinks the node with the smallest key in the current sub-tree,
+            whatever its multiplicity.
+            :complexity: O(D) where D is the depth of the current sub-tree
+        """
+        if current.left is None:
+            return current.right
+        current.left = self.delete_minimal_aux(current.left)
+        current.subtree_size = size(current.left) + size(current.right) + current.count
         return current
 
     def get_successor(self, current: TreeNode) -> TreeNode:
@@ -182,6 +233,15 @@ class BinarySearchTree(Generic[K, I]):
             return current
         return self.get_minimal_aux(current.left)
 
+    def get_maximal(self, current: TreeNode) -> TreeNode:
+        """
+            Get a node having the largest key in the current sub-tree.
+            :complexity: O(D) where D is the depth of the current sub-tree
+        """
+        while current.right is not None:
+            current = current.right
+        return current
+
     def is_leaf(self, current: TreeNode) -> bool:
         """ Simple check whether or not the node is a leaf. """
 
@@ -210,24 +270,539 @@ class BinarySearchTree(Generic[K, I]):
 
     def kth_smallest(self, k: int, current: TreeNode) -> TreeNode:
         """
-        Finds the kth smallest value by key in the subtree rooted at current.
+            Finds the kth smallest value by key in the subtree rooted at current.
+            :complexity: O(D) where D is the depth of the subtree
+            :raises IndexError: if k is not between 1 and the size of the subtree
+        """
+        while current is not None:
+            left_size = size(current.left)
+            if k <= left_size:
+                current = current.left
+            elif k <= left_size + current.count:
+                return current
+            else:
+                k -= left_size + current.count
+                current = current.right
+        raise IndexError('Rank out of range')
+
+    def select(self, k: int) -> K:
         """
-        if k != 1 and current.left is None:
-            return self.kth_smallest(k - 1, current.right)
+            Returns the kth smallest key in the tree (1-indexed).
+            :complexity: O(D) where D is the depth of the tree
+            :raises IndexError: if k is not between 1 and len(self)
+        """
+        return self.kth_smallest(k, self.root).key
 
-        if self.is_leaf(current) or (current.left is None and k == 1) or current.left.subtree_size + 1 == k:
-            return current
+    def select_range(self, lo: int, hi: int) -> List[K]:
+        """
+            Returns the keys ranked lo to hi (1-indexed, inclusive) in order, using a
+            single descent to rank lo followed by an in-order walk.
+            :complexity: O(D + R) where D is the depth of the tree and R = hi - lo + 1
+        """
+        result = []
+        lo = max(lo, 1)
+        hi = min(hi, len(self))
+        if lo > hi:
+            return result
+        # ancestors still to be visited in-order, ending with the node ranked lo
+        stack = []
+        current = self.root
+        k = lo
+        while current is not None:
+            left_size = size(current.left)
+            if k <= left_size:
+                stack.append(current)
+                current = current.left
+            elif k <= left_size + current.count:
+                stack.append(current)
+                break
+            else:
+                k -= left_size + current.count
+                current = current.right
+        # copies of the first key that are ranked below lo
+        skip = k - size(current.left) - 1
+        while len(result) < hi - lo + 1:
+            current = stack.pop()
+            result.extend([current.key] * min(current.count - skip, hi - lo + 1 - len(result)))
+            skip = 0
+            current = current.right
+            while current is not None:
+                stack.append(current)
+                current = current.left
+        return result
+
+    def select_many(self, ranks: List[int]) -> List[K]:
+        """
+            Returns the keys at each of the given ranks (1-indexed, sorted ascending).
+            The ranks share one descent: every node on the way to any of them is
+            visited once, instead of once per rank.
+            :complexity: O(P + M) where P is the number of nodes on the union of the
+            search paths (at most M * D) and M = len(ranks)
+            :raises IndexError: if a rank is not between 1 and len(self)
+        """
+        if ranks and not 1 <= ranks[0] <= ranks[-1] <= len(self):
+            raise IndexError('Rank out of range')
+        result = []
+        self.select_many_aux(self.root, ranks, 0, len(ranks), 0, result)
+        return result
+
+    def select_many_aux(self, current: TreeNode, ranks: List[int], lo: int, hi: int,
+                        offset: int, result: List[K]) -> None:
+        """ Appends the keys ranked ranks[lo:hi], which all fall in the subtree of
+        current; offset is the number of keys ranked before that subtree. """
+        if lo == hi:
+            return
+        left_end = offset + size(current.left)
+        mid = bisect_right(ranks, left_end, lo, hi)
+        self.select_many_aux(current.left, ranks, lo, mid, offset, result)
+        end = bisect_right(ranks, left_end + current.count, mid, hi)
+        result.extend([current.key] * (end - mid))
+        self.select_many_aux(current.right, ranks, end, hi, left_end + current.count, result)
+
+    def rank(self, key: K) -> int:
+        """
+            Returns the number of keys strictly smaller than key. The key itself
+            need not be in the tree.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        return self.rank_aux(key, inclusive=False)
+
+    def rank_aux(self, key: K, inclusive: bool) -> int:
+        """ Counts the keys smaller than (or, if inclusive, equal to) key. """
+        count = 0
+        current = self.root
+        while current is not None:
+            if key < current.key:
+                current = current.left
+            elif key > current.key:
+                count += size(current.left) + current.count
+                current = current.right
+            else:
+                count += size(current.left) + (current.count if inclusive else 0)
+                break
+        return count
+
+    def count_range(self, lo: K, hi: K) -> int:
+        """
+            Returns the number of keys k with lo <= k <= hi.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        if hi < lo:
+            return 0
+        return self.rank_aux(hi, inclusive=True) - self.rank_aux(lo, inclusive=False)
+
+    def floor(self, key: K) -> K:
+        """
+            Returns the largest key in the tree that is <= key.
+            :complexity: O(CompK * D) where D is the depth of the tree
+            :raises KeyError: if every key is larger than key
+        """
+        best = None
+        current = self.root
+        while current is not None:
+            if key < current.key:
+                current = current.left
+            elif key > current.key:
+                best = current
+                current = current.right
+            else:
+                return current.key
+        if best is None:
+            raise KeyError('No key at or below: {0}'.format(key))
+        return best.key
+
+    def ceiling(self, key: K) -> K:
+        """
+            Returns the smallest key in the tree that is >= key.
+            :complexity: O(CompK * D) where D is the depth of the tree
+            :raises KeyError: if every key is smaller than key
+        """
+        best = None
+        current = self.root
+        while current is not None:
+            if key > current.key:
+                current = current.right
+            elif key < current.key:
+                best = current
+                current = current.left
+            else:
+                return current.key
+        if best is None:
+            raise KeyError('No key at or above: {0}'.format(key))
+        return best.key
+
+    def iter_nodes(self) -> Iterator[TreeNode]:
+        """
+            Yields the nodes of the tree in key order, without recursion.
+            :complexity: O(N) for the full walk, where N is the number of nodes
+        """
+        stack = []
+        current = self.root
+        while stack or current is not None:
+            while current is not None:
+                stack.append(current)
+                current = current.left
+            current = stack.pop()
+            yield current
+            current = current.right
+
+    def seek(self, key: K) -> BSTCursor[K, I]:
+        """
+            Returns a cursor on the node with the smallest key >= key
+            (past the end if there is none).
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        cursor = BSTCursor(self)
+        path = cursor.path
+        depth = 0  # length of the path up to the best candidate so far
+        current = self.root
+        while current is not None:
+            path.append(current)
+            if key < current.key:
+                depth = len(path)
+                current = current.left
+            elif key > current.key:
+                current = current.right
+            else:
+                depth = len(path)
+                break
+        del path[depth:]
+        return cursor
+
+    def seek_rank(self, k: int) -> BSTCursor[K, I]:
+        """
+            Returns a cursor on the node holding the kth smallest key (1-indexed).
+            :complexity: O(D) where D is the depth of the tree
+            :raises IndexError: if k is not between 1 and len(self)
+        """
+        cursor = BSTCursor(self)
+        current = self.root
+        while current is not None:
+            cursor.path.append(current)
+            left_size = size(current.left)
+            if k <= left_size:
+                current = current.left
+            elif k <= left_size + current.count:
+                return cursor
+            else:
+                k -= left_size + current.count
+                current = current.right
+        raise IndexError('Rank out of range')
+
+    def inorder(self, f: Callable[[K], None]) -> None:
+        """
+            Calls f on every key in increasing order, once per copy of a repeated key.
+            :complexity: O(N) where N is the number of keys
+        """
+        for current in self.iter_nodes():
+            for _ in range(current.count):
+                f(current.key)
+
+    @classmethod
+    def from_sorted(cls, pairs: Iterable[Tuple[K, I]], duplicates: str = DUPLICATES_ERROR) -> BinarySearchTree[K, I]:
+        """
+            Builds a perfectly balanced tree from (key, item) pairs in increasing key order.
+            :complexity: O(N) where N is the number of pairs
+            :raises ValueError: if the keys are not strictly increasing
+        """
+        pairs = list(pairs)
+        for i in range(1, len(pairs)):
+            if not pairs[i - 1][0] < pairs[i][0]:
+                raise ValueError('Keys should be strictly increasing')
+        tree = cls(duplicates)
+        wrap = duplicates == DUPLICATES_LIST
+        tree.root = tree.build_aux([(key, [item] if wrap else item, 1) for key, item in pairs], 0, len(pairs))
+        tree.length = len(pairs)
+        return tree
+
+    def build_aux(self, nodes: List[Tuple[K, I, int]], lo: int, hi: int) -> TreeNode | None:
+        """ Builds the balanced subtree holding the (key, item, count) triples nodes[lo:hi]. """
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        key, item, count = nodes[mid]
+        current = TreeNode(key, item=item, count=count)
+        current.left = self.build_aux(nodes, lo, mid)
+        current.right = self.build_aux(nodes, mid + 1, hi)
+        current.subtree_size = size(current.left) + size(current.right) + count
+        return current
+
+    def split(self, key: K) -> Tuple[BinarySearchTree[K, I], BinarySearchTree[K, I]]:
+        """
+            Splits the tree into one holding the keys smaller than key and one holding
+            the rest. Nodes are moved, not copied, so this tree is left empty.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        left, right = type(self)(self.duplicates), type(self)(self.duplicates)
+        left.root, right.root = self.split_aux(self.root, key)
+        left.length, right.length = size(left.root), size(right.root)
+        self.root = None
+        self.length = 0
+        return left, right
 
-        elif current.left.subtree_size + 1 > k:
-            return self.kth_smallest(k, current.left)
+    def split_aux(self, current: TreeNode | None, key: K) -> Tuple[TreeNode | None, TreeNode | None]:
+        """ Splits the subtree at current along the search path of key. """
+        if current is None:
+            return None, None
+        if current.key < key:
+            current.right, right = self.split_aux(current.right, key)
+            current.subtree_size = size(current.left) + size(current.right) + current.count
+            return current, right
+        left, current.left = self.split_aux(current.left, key)
+        current.subtree_size = size(current.left) + size(current.right) + current.count
+        return left, current
+
+    @classmethod
+    def combined_class(cls, a: BinarySearchTree[K, I], b: BinarySearchTree[K, I]) -> type:
+        """
+            Class of the result of joining or merging a and b. The result keeps nodes
+            (or items) of its inputs, so when one of them is persistent the result has
+            to copy on write as well, or writing to it would change earlier snapshots.
+            :complexity: O(1)
+        """
+        if not cls.persistent:
+            for tree in (a, b):
+                if tree.persistent:
+                    return type(tree)
+        return cls
+
+    @classmethod
+    def join(cls, left: BinarySearchTree[K, I], right: BinarySearchTree[K, I]) -> BinarySearchTree[K, I]:
+        """
+            Joins two trees where every key of left is smaller than every key of right.
+            The smallest node of right becomes the new root. Both trees are left empty.
+            The result is persistent if either tree is, see combined_class.
+            :complexity: O(CompK * (D1 + D2)) where D1 and D2 are the depths of the trees
+            :raises ValueError: if the key ranges overlap
+            :raises TypeError: if either tree is read-only
+        """
+        if left.read_only or right.read_only:
+            raise TypeError('Snapshots are read-only')
+        tree = cls.combined_class(left, right)(left.duplicates)
+        if left.root is None or right.root is None:
+            tree.root = left.root if right.root is None else right.root
+        else:
+            top = right.get_minimal(right.root)
+            if not left.get_maximal(left.root).key < top.key:
+                raise ValueError('Joined trees should not overlap')
+            right.root = right.delete_minimal_aux(right.root)
+            top = TreeNode(top.key, item=top.item, left=left.root, right=right.root, count=top.count)
+            top.subtree_size = size(top.left) + size(top.right) + top.count
+            tree.root = top
+        tree.length = size(tree.root)
+        for other in (left, right):
+            other.root = None
+            other.length = 0
+        return tree
+
+    @classmethod
+    def merge(cls, a: BinarySearchTree[K, I], b: BinarySearchTree[K, I]) -> BinarySearchTree[K, I]:
+        """
+            Merges two trees with interleaved keys into a new balanced tree, by merging
+            their in-order walks. Trees with disjoint key ranges are joined instead.
+            A key held by both trees is combined following the duplicates policy of a.
+            Both trees are left empty. The result is persistent if either tree is.
+            :complexity: O(N + M) where N and M are the sizes of the trees
+            (O(CompK * (D1 + D2)) for disjoint ranges)
+            :raises ValueError: if both trees hold the same key under the 'error' policy
+            :raises TypeError: if either tree is read-only
+        """
+        if a.read_only or b.read_only:
+            raise TypeError('Snapshots are read-only')
+        for first, second in ((a, b), (b, a)):
+            if first.root is None or second.root is None or \
+                    first.get_maximal(first.root).key < second.get_minimal(second.root).key:
+                tree = cls.join(first, second)
+                # join takes the policy of its left tree, which may be b
+                tree.duplicates = a.duplicates
+                return tree
+
+        nodes = []
+        nodes_a, nodes_b = a.iter_nodes(), b.iter_nodes()
+        x, y = next(nodes_a, None), next(nodes_b, None)
+        while x is not None or y is not None:
+            if y is None or (x is not None and x.key < y.key):
+                nodes.append((x.key, x.item, x.count))
+                x = next(nodes_a, None)
+            elif x is None or y.key < x.key:
+                nodes.append((y.key, y.item, y.count))
+                y = next(nodes_b, None)
+            else:
+                if a.duplicates == DUPLICATES_ERROR:
+                    raise ValueError('Merging duplicate item')
+                elif a.duplicates == DUPLICATES_REPLACE:
+                    nodes.append((y.key, y.item, 1))
+                elif a.duplicates == DUPLICATES_LIST:
+                    nodes.append((y.key, x.item + y.item, x.count + y.count))
+                else:
+                    nodes.append((y.key, y.item, x.count + y.count))
+                x, y = next(nodes_a, None), next(nodes_b, None)
+        tree = cls.combined_class(a, b)(a.duplicates)
+        tree.root = tree.build_aux(nodes, 0, len(nodes))
+        tree.length = size(tree.root)
+        for other in (a, b):
+            other.root = None
+            other.length = 0
+        return tree
+
+
+class BSTCursor(Generic[K, I]):
+    """
+        Position on a node of a BinarySearchTree, for walking the keys in order.
+        The cursor keeps the path from the root to its node, so stepping to the
+        next or previous node costs O(1) amortised over a walk. Changing the tree
+        other than through delete_current invalidates the cursor.
+    """
+
+    def __init__(self, tree: BinarySearchTree[K, I]) -> None:
+        self.tree = tree
+        # root-to-node path; empty when the cursor is off either end
+        self.path = []
+        # which end the cursor fell off: 1 past the last node, -1 before the first
+        self.off_end = 1
+
+    def peek(self) -> TreeNode | None:
+        """
+            Returns the node under the cursor, or None off either end.
+            :complexity: O(1)
+        """
+        return self.path[-1] if self.path else None
 
-        elif current.left.subtree_size + 1 < k:
-            return self.kth_smallest(k - (current.left.subtree_size + 1), current.right)
+    def next(self) -> TreeNode | None:
+        """
+            Moves to the node with the next larger key and returns it
+            (None once past the last node).
+            :complexity: O(1) amortised, O(D) worst case
+        """
+        return self.step('right', 'left', 1)
+
+    def prev(self) -> TreeNode | None:
+        """
+            Moves to the node with the next smaller key and returns it
+            (None once before the first node).
+            :complexity: O(1) amortised, O(D) worst case
+        """
+        return self.step('left', 'right', -1)
+
+    def step(self, forward: str, backward: str, direction: int) -> TreeNode | None:
+        """ In-order step towards the forward child; the two directions mirror each other. """
+        path = self.path
+        if not path:
+            if self.off_end == direction or self.tree.root is None:
+                return None
+            # coming back in from the other end
+            current = self.tree.root
+        else:
+            current = getattr(path[-1], forward)
+            if current is None:
+                # climb until we leave a backward child
+                child = path.pop()
+                while path and getattr(path[-1], forward) is child:
+                    child = path.pop()
+                if not path:
+                    self.off_end = direction
+                return self.peek()
+        while current is not None:
+            path.append(current)
+            current = getattr(current, backward)
+        return path[-1]
+
+    def delete_current(self) -> None:
+        """
+            Deletes one copy of the key under the cursor and moves on to the next key
+            once the node is gone.
+            :complexity: O(CompK * D) where D is the depth of the tree
+            :raises IndexError: if the cursor is off either end
+        """
+        current = self.peek()
+        if current is None:
+            raise IndexError('Cursor is not on a node')
+        del self.tree[current.key]
+        # a repeated key is still there; otherwise this lands on the successor
+        self.path = self.tree.seek(current.key).path
+        self.off_end = 1
 
 
+class PersistentBinarySearchTree(BinarySearchTree[K, I]):
+    """
+        Copy-on-write binary search tree.
+        Nodes are never changed once they are reachable from a published root.
+        Updates copy the nodes on their search path and then publish the new root
+        with a single assignment, so snapshot() can hand out O(1) views that stay
+        consistent while the tree keeps changing.
+    """
 
+    persistent = True
+
+    def insert_aux(self, current: TreeNode, key: K, item: I) -> TreeNode:
+        """
+            Path-copying insertion, see BinarySearchTree.insert_aux
+            :complexity: O(CompK * D) plus D node copies, where D is the depth of the tree
+        """
+        if current is not None:
+            current = copy(current)
+        return super().insert_aux(current, key, item)
+
+    def delete_aux(self, current: TreeNode, key: K) -> TreeNode:
+        """
+            Path-copying deletion, see BinarySearchTree.delete_aux
+            :complexity: O(CompK * D) plus D node copies, where D is the depth of the tree
+        """
+        if current is not None:
+            current = copy(current)
+        return super().delete_aux(current, key)
+
+    def insert_duplicate(self, current: TreeNode, item: I) -> None:
+        if self.duplicates == DUPLICATES_LIST:
+            current.item = list(current.item)
+        super().insert_duplicate(current, item)
+
+    def delete_duplicate(self, current: TreeNode) -> None:
+        if self.duplicates == DUPLICATES_LIST:
+            current.item = list(current.item)
+        super().delete_duplicate(current)
+
+    def delete_minimal_aux(self, current: TreeNode) -> TreeNode | None:
+        return super().delete_minimal_aux(copy(current))
+
+    def split_aux(self, current: TreeNode | None, key: K) -> Tuple[TreeNode | None, TreeNode | None]:
+        if current is not None:
+            current = copy(current)
+        return super().split_aux(current, key)
+
+    def snapshot(self) -> BinarySearchTreeSnapshot[K, I]:
+        """
+            Returns a read-only view of the tree as it is now.
+            :complexity: O(1)
+        """
+        view = BinarySearchTreeSnapshot(self.duplicates)
+        root = self.root
+        view.root = root
+        view.length = size(root)
+        return view
+
+
+class BinarySearchTreeSnapshot(BinarySearchTree[K, I]):
+    """ Immutable view of a PersistentBinarySearchTree at one point in time. """
+
+    read_only = True
+
+    def insert_aux(self, current: TreeNode, key: K, item: I) -> TreeNode:
+        raise TypeError('Snapshots are read-only')
+
+    def delete_aux(self, current: TreeNode, key: K) -> TreeNode:
+        raise TypeError('Snapshots are read-only')
 
+    def delete_minimal_aux(self, current: TreeNode) -> TreeNode | None:
+        raise TypeError('Snapshots are read-only')
 
+    def split(self, key: K) -> Tuple[BinarySearchTree[K, I], BinarySearchTree[K, I]]:
+        raise TypeError('Snapshots are read-only')
 
+    def snapshot(self) -> BinarySearchTreeSnapshot[K, I]:
+        return self
 
 
+def size(current: TreeNode | None) -> int:
+    """ Size of the subtree rooted at current (0 for an empty subtree). """
+    return 0 if current is None else current.subtree_size
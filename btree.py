@@ -0,0 +1,302 @@
+""" B+-tree ADT with order statistics.
+    Keys and items live in sorted Python lists in the leaves, so the search
+    inside a node is a bisect at C speed. Internal nodes keep the number of
+    keys below each child, which answers rank queries in one descent.
+    Offers the mapping and order-statistics interface of BinarySearchTree.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import TypeVar, Generic, List, Tuple, NamedTuple
+
+from bst import DUPLICATES_ERROR, DUPLICATES_REPLACE, DUPLICATES_LIST, DUPLICATE_POLICIES
+
+K = TypeVar('K')
+I = TypeVar('I')
+
+
+class BTreeEntry(NamedTuple):
+    """ Key and item stored at one rank, readable like a BST node (.key, .item). """
+
+    key: K
+    item: I
+
+
+@dataclass
+class BTreeNode(Generic[K, I]):
+    """
+        Node class represent B+-tree nodes.
+        Leaves hold keys, items and the multiplicity of each key; internal nodes
+        hold separators and, per child, the number of keys below it.
+    """
+
+    keys: List[K] = field(default_factory=list)
+    counts: List[int] = field(default_factory=list)
+    items: List[I] | None = None
+    children: List[BTreeNode] | None = None
+    size: int = 0
+
+    def is_leaf(self) -> bool:
+        return self.children is None
+
+
+class BTree(Generic[K, I]):
+    """
+        B+-tree keyed mapping with order statistics.
+        Child i of an internal node holds the keys k with keys[i-1] <= k < keys[i].
+        Deletion drops nodes once they are empty instead of rebalancing, so
+        nodes may run below half full after many deletions.
+    """
+
+    MIN_FANOUT = 4
+
+    def __init__(self, duplicates: str = DUPLICATES_ERROR, fanout: int = 64) -> None:
+        """
+            Initialises an empty B+-tree whose nodes hold at most fanout keys (leaves)
+            or children (internal nodes). duplicates is one of bst.DUPLICATE_POLICIES.
+            :complexity: O(1)
+        """
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError('Unknown duplicates policy: {0}'.format(duplicates))
+        if fanout < self.MIN_FANOUT:
+            raise ValueError('Fanout should be at least {0}.'.format(self.MIN_FANOUT))
+        self.duplicates = duplicates
+        self.fanout = fanout
+        self.root = BTreeNode(items=[])
+        self.length = 0
+
+    def is_empty(self) -> bool:
+        """
+            Checks to see if the tree is empty
+            :complexity: O(1)
+        """
+        return self.length == 0
+
+    def __len__(self) -> int:
+        """ Returns the number of keys in the tree, counting repeated keys. """
+        return self.length
+
+    def __contains__(self, key: K) -> bool:
+        """
+            Checks to see if the key is in the tree
+            :complexity: see __getitem__(self, key: K) -> I
+        """
+        try:
+            _ = self[key]
+        except KeyError:
+            return False
+        else:
+            return True
+
+    def __getitem__(self, key: K) -> I:
+        """
+            Attempts to get an item in the tree, it uses the Key to attempt to find it
+            :complexity: O(log_F(N) * log(F)) where F is the fanout
+        """
+        current = self.root
+        while not current.is_leaf():
+            current = current.children[bisect_right(current.keys, key)]
+        i = bisect_left(current.keys, key)
+        if i == len(current.keys) or current.keys[i] != key:
+            raise KeyError('Key not found: {0}'.format(key))
+        return current.items[i]
+
+    def __setitem__(self, key: K, item: I) -> None:
+        """
+            Inserts the item at key, following the duplicates policy for present keys.
+            :complexity: O(F * log_F(N)) shifting and splitting the nodes on the path
+        """
+        split = self.insert_aux(self.root, key, item)
+        if split is not None:
+            separator, right = split
+            left = self.root
+            self.root = BTreeNode([separator], [left.size, right.size], children=[left, right],
+                                  size=left.size + right.size)
+
+    def insert_aux(self, current: BTreeNode, key: K, item: I) -> Tuple[K, BTreeNode] | None:
+        """
+            Inserts below current. Returns the separator and new right sibling if
+            current had to be split, None otherwise.
+        """
+        if current.is_leaf():
+            i = bisect_left(current.keys, key)
+            if i < len(current.keys) and current.keys[i] == key:
+                self.insert_duplicate(current, i, item)
+            else:
+                current.keys.insert(i, key)
+                current.items.insert(i, [item] if self.duplicates == DUPLICATES_LIST else item)
+                current.counts.insert(i, 1)
+                self.length += 1
+            current.size = sum(current.counts)
+            if len(current.keys) <= self.fanout:
+                return None
+            mid = len(current.keys) // 2
+            right = BTreeNode(current.keys[mid:], current.counts[mid:], items=current.items[mid:])
+            del current.keys[mid:], current.counts[mid:], current.items[mid:]
+            current.size = sum(current.counts)
+            right.size = sum(right.counts)
+            return right.keys[0], right
+
+        i = bisect_right(current.keys, key)
+        child = current.children[i]
+        split = self.insert_aux(child, key, item)
+        current.counts[i] = child.size
+        if split is not None:
+            separator, right = split
+            current.keys.insert(i, separator)
+            current.children.insert(i + 1, right)
+            current.counts.insert(i + 1, right.size)
+        current.size = sum(current.counts)
+        if len(current.children) <= self.fanout:
+            return None
+        mid = len(current.children) // 2
+        separator = current.keys[mid - 1]
+        right = BTreeNode(current.keys[mid:], current.counts[mid:], children=current.children[mid:])
+        del current.keys[mid - 1:], current.counts[mid:], current.children[mid:]
+        current.size = sum(current.counts)
+        right.size = sum(right.counts)
+        return separator, right
+
+    def insert_duplicate(self, leaf: BTreeNode, i: int, item: I) -> None:
+        """ Applies the duplicates policy to the key at position i of leaf. """
+        if self.duplicates == DUPLICATES_ERROR:
+            raise ValueError('Inserting duplicate item')
+        elif self.duplicates == DUPLICATES_REPLACE:
+            leaf.items[i] = item
+        else:
+            if self.duplicates == DUPLICATES_LIST:
+                leaf.items[i].append(item)
+            else:
+                leaf.items[i] = item
+            leaf.counts[i] += 1
+            self.length += 1
+
+    def __delitem__(self, key: K) -> None:
+        """
+            Deletes one copy of key.
+            :complexity: O(F * log_F(N))
+        """
+        self.delete_aux(self.root, key)
+        while not self.root.is_leaf() and len(self.root.children) == 1:
+            self.root = self.root.children[0]
+        if not self.root.is_leaf() and not self.root.children:
+            self.root = BTreeNode(items=[])
+
+    def delete_aux(self, current: BTreeNode, key: K) -> None:
+        """ Deletes below current, unlinking any child left empty. """
+        if current.is_leaf():
+            i = bisect_left(current.keys, key)
+            if i == len(current.keys) or current.keys[i] != key:
+                raise ValueError('Deleting non-existent item')
+            self.length -= 1
+            if current.counts[i] > 1:
+                current.counts[i] -= 1
+                if self.duplicates == DUPLICATES_LIST:
+                    current.items[i].pop(0)
+            else:
+                del current.keys[i], current.counts[i], current.items[i]
+            current.size -= 1
+            return
+
+        i = bisect_right(current.keys, key)
+        child = current.children[i]
+        self.delete_aux(child, key)
+        current.size -= 1
+        if child.size > 0:
+            current.counts[i] = child.size
+            return
+        del current.children[i], current.counts[i]
+        if current.keys:
+            del current.keys[max(0, i - 1)]
+
+    def kth_smallest(self, k: int) -> BTreeEntry:
+        """
+            Finds the entry holding the kth smallest key (1-indexed).
+            :complexity: O(F * log_F(N))
+            :raises IndexError: if k is not between 1 and len(self)
+        """
+        if not 1 <= k <= self.length:
+            raise IndexError('Rank out of range')
+        current = self.root
+        while not current.is_leaf():
+            i = 0
+            while k > current.counts[i]:
+                k -= current.counts[i]
+                i += 1
+            current = current.children[i]
+        i = 0
+        while k > current.counts[i]:
+            k -= current.counts[i]
+            i += 1
+        return BTreeEntry(current.keys[i], current.items[i])
+
+    def select(self, k: int) -> K:
+        """
+            Returns the kth smallest key in the tree (1-indexed).
+            :complexity: see kth_smallest
+        """
+        return self.kth_smallest(k).key
+
+    def select_range(self, lo: int, hi: int) -> List[K]:
+        """
+            Returns the keys ranked lo to hi (1-indexed, inclusive) in order.
+            :complexity: O(F * log_F(N) + R) where R = hi - lo + 1
+        """
+        result = []
+        lo = max(lo, 1)
+        hi = min(hi, self.length)
+        if lo <= hi:
+            self.select_range_aux(self.root, lo, hi, result)
+        return result
+
+    def select_range_aux(self, current: BTreeNode, lo: int, hi: int, result: List[K]) -> None:
+        """ Appends the keys of current ranked lo to hi (relative to current). """
+        offset = 0
+        for i, count in enumerate(current.counts):
+            if offset >= hi:
+                break
+            if offset + count >= lo:
+                if current.is_leaf():
+                    copies = min(offset + count, hi) - max(offset + 1, lo) + 1
+                    result.extend([current.keys[i]] * copies)
+                else:
+                    self.select_range_aux(current.children[i], lo - offset, hi - offset, result)
+            offset += count
+
+    def select_many(self, ranks: List[int]) -> List[K]:
+        """
+            Returns the keys at each of the given ranks (1-indexed, sorted ascending).
+            :complexity: O(M * F * log_F(N)) where M = len(ranks)
+        """
+        return [self.kth_smallest(k).key for k in ranks]
+
+    def rank(self, key: K) -> int:
+        """
+            Returns the number of keys strictly smaller than key.
+            :complexity: O(F * log_F(N))
+        """
+        return self.rank_aux(key, inclusive=False)
+
+    def rank_aux(self, key: K, inclusive: bool) -> int:
+        """ Counts the keys smaller than (or, if inclusive, equal to) key. """
+        count = 0
+        current = self.root
+        while not current.is_leaf():
+            i = bisect_right(current.keys, key)
+            count += sum(current.counts[:i])
+            current = current.children[i]
+        i = bisect_right(current.keys, key) if inclusive else bisect_left(current.keys, key)
+        return count + sum(current.counts[:i])
+
+    def count_range(self, lo: K, hi: K) -> int:
+        """
+            Returns the number of keys k with lo <= k <= hi.
+            :complexity: O(F * log_F(N))
+        """
+        if hi < lo:
+            return 0
+        return self.rank_aux(hi, inclusive=True) - self.rank_aux(lo, inclusive=False)
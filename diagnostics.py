@@ -0,0 +1,232 @@
+""" Shape diagnostics for BinarySearchTree and ThreeDeeBeeTree.
+    shape_report walks the whole tree once, iteratively; sample_shape estimates
+    the same figures from random root-to-node descents, for trees too large to
+    walk. Both only read the subtree sizes the trees already maintain.
+    Depths count edges: the root is at depth 0.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from dataclasses import dataclass, field
+from random import Random
+from typing import Callable, List, Tuple
+
+from bst import BinarySearchTree
+from threedeebeetree import ThreeDeeBeeTree, OCT_NAMES
+
+# octants holding the points above a node on each axis, see BeeNode.get_child_for_key
+POSITIVE_OCTANTS = {'x': (1, 2, 3, 4), 'y': (1, 4, 5, 6), 'z': (1, 2, 6, 7)}
+# a split is only judged once one of its sides holds this many keys
+MIN_SIDE = 19
+# alert thresholds of ShapeReport.needs_rebuild
+MAX_RATIO = 7.0
+MAX_DEPTH_OVERHEAD = 2.0
+
+
+@dataclass
+class ShapeReport:
+    """
+        Shape of a tree. worst_ratio is the largest ratio between the sides of a
+        split, over every node and axis where one side holds at least min_side keys;
+        worst_key, worst_axis and worst_sides (larger, smaller) locate it. The
+        axes are x, y and z for a ThreeDeeBeeTree, and key (right against left)
+        for a BinarySearchTree. height is -1 for an empty tree.
+        Sampled reports are estimates: the histogram is scaled up to the size of
+        the tree, and height and worst_ratio are lower bounds.
+    """
+
+    size: int
+    height: int
+    depth_histogram: List[int]
+    average_depth: float
+    optimal_average_depth: float
+    worst_ratio: float = 1.0
+    worst_key: object = None
+    worst_axis: str = ''
+    worst_sides: Tuple[int, int] = (0, 0)
+    sampled: bool = False
+
+    @property
+    def depth_overhead(self) -> float:
+        """ How many times deeper the average node is than in a complete tree. """
+        if self.optimal_average_depth == 0:
+            return 1.0
+        return self.average_depth / self.optimal_average_depth
+
+    def needs_rebuild(self, max_ratio: float = MAX_RATIO,
+                      max_depth_overhead: float = MAX_DEPTH_OVERHEAD) -> bool:
+        """ Whether the tree is unbalanced enough that queries are worth a rebuild. """
+        return self.worst_ratio > max_ratio or self.depth_overhead > max_depth_overhead
+
+
+@dataclass
+class Worst:
+    """ Running maximum of the split ratios, ordered like (ratio, smaller side). """
+
+    min_side: int
+    ratio: float = 1.0
+    smaller: int = 0
+    key: object = None
+    axis: str = ''
+    sides: Tuple[int, int] = field(default=(0, 0))
+
+    def update(self, key, axis: str, positive: int, negative: int) -> None:
+        larger, smaller = max(positive, negative), min(positive, negative)
+        if larger < self.min_side:
+            return
+        ratio = larger / smaller if smaller else float('inf')
+        if (ratio, smaller) > (self.ratio, self.smaller):
+            self.ratio, self.smaller = ratio, smaller
+            self.key, self.axis, self.sides = key, axis, (larger, smaller)
+
+
+def size(node) -> int:
+    return 0 if node is None else node.subtree_size
+
+
+def bst_children(node) -> list:
+    return [node.left, node.right]
+
+
+def bst_splits(node) -> List[Tuple[str, int, int]]:
+    return [('key', size(node.right), size(node.left))]
+
+
+def bee_children(node) -> list:
+    return [getattr(node, name) for name in OCT_NAMES]
+
+
+def bee_splits(node) -> List[Tuple[str, int, int]]:
+    sizes = [size(child) for child in bee_children(node)]
+    total = sum(sizes)
+    splits = []
+    for axis, octants in POSITIVE_OCTANTS.items():
+        positive = sum(sizes[octant - 1] for octant in octants)
+        splits.append((axis, positive, total - positive))
+    return splits
+
+
+def tree_shape(tree: BinarySearchTree | ThreeDeeBeeTree) -> Tuple[Callable, Callable, int]:
+    """ Returns the children and splits functions of the tree's nodes, and their branching. """
+    if isinstance(tree, ThreeDeeBeeTree):
+        return bee_children, bee_splits, len(OCT_NAMES)
+    if isinstance(tree, BinarySearchTree):
+        return bst_children, bst_splits, 2
+    raise TypeError('No shape diagnostics for {0}'.format(type(tree).__name__))
+
+
+def optimal_average_depth(n: int, branching: int) -> float:
+    """
+        Average node depth of a complete tree of n nodes where every node has up
+        to branching children.
+        :complexity: O(log n)
+    """
+    if n == 0:
+        return 0.0
+    total, depth, level, remaining = 0, 0, 1, n
+    while remaining > 0:
+        placed = min(level, remaining)
+        total += placed * depth
+        remaining -= placed
+        depth += 1
+        level *= branching
+    return total / n
+
+
+def shape_report(tree: BinarySearchTree | ThreeDeeBeeTree, min_side: int = MIN_SIDE) -> ShapeReport:
+    """
+        Measures the shape of the tree in a single iterative walk.
+        :complexity: O(N) where N is the number of nodes
+    """
+    children, splits, branching = tree_shape(tree)
+    histogram = []
+    worst = Worst(min_side)
+    nodes = total_depth = 0
+    stack = [(tree.root, 0)] if tree.root is not None else []
+    while stack:
+        node, depth = stack.pop()
+        if depth == len(histogram):
+            histogram.append(0)
+        histogram[depth] += 1
+        nodes += 1
+        total_depth += depth
+        for axis, positive, negative in splits(node):
+            worst.update(node.key, axis, positive, negative)
+        stack.extend((child, depth + 1) for child in children(node) if child is not None)
+    return ShapeReport(
+        size=nodes,
+        height=len(histogram) - 1,
+        depth_histogram=histogram,
+        average_depth=total_depth / nodes if nodes else 0.0,
+        optimal_average_depth=optimal_average_depth(nodes, branching),
+        worst_ratio=worst.ratio,
+        worst_key=worst.key,
+        worst_axis=worst.axis,
+        worst_sides=worst.sides,
+    )
+
+
+def sample_shape(tree: BinarySearchTree | ThreeDeeBeeTree, samples: int = 1024,
+                 min_side: int = MIN_SIDE, seed: int | None = None) -> ShapeReport:
+    """
+        Estimates shape_report from random descents. Each descent stops at a node
+        with probability proportional to the keys it holds and otherwise moves to
+        a child in proportion to its subtree size, so it ends at a key picked
+        uniformly at random. Splits are judged at every node passed on the way;
+        the heavy splits near the root, which matter most, are passed by nearly
+        every descent. Node counts are estimated from key counts, so keys repeated
+        in a multiset tree count as separate nodes.
+        :complexity: O(S * D) where S is samples and D the depth of the tree
+    """
+    children, splits, branching = tree_shape(tree)
+    rng = Random(seed)
+    histogram = []
+    worst = Worst(min_side)
+    judged = set()
+    n = size(tree.root)
+    for _ in range(samples if n else 0):
+        node, depth = tree.root, 0
+        while True:
+            if id(node) not in judged:
+                judged.add(id(node))
+                for axis, positive, negative in splits(node):
+                    worst.update(node.key, axis, positive, negative)
+            pick = rng.randrange(node.subtree_size)
+            pick -= getattr(node, 'count', 1)
+            if pick < 0:
+                break
+            for child in children(node):
+                pick -= size(child)
+                if pick < 0:
+                    node, depth = child, depth + 1
+                    break
+        if depth >= len(histogram):
+            histogram.extend([0] * (depth + 1 - len(histogram)))
+        histogram[depth] += 1
+    total_depth = sum(depth * count for depth, count in enumerate(histogram))
+    return ShapeReport(
+        size=n,
+        height=len(histogram) - 1,
+        depth_histogram=[round(count * n / samples) for count in histogram],
+        average_depth=total_depth / samples if n else 0.0,
+        optimal_average_depth=optimal_average_depth(n, branching),
+        worst_ratio=worst.ratio,
+        worst_key=worst.key,
+        worst_axis=worst.axis,
+        worst_sides=worst.sides,
+        sampled=True,
+    )
+
+
+def check_shape(tree: BinarySearchTree | ThreeDeeBeeTree, alert: Callable[[ShapeReport], None],
+                samples: int | None = None, max_ratio: float = MAX_RATIO,
+                max_depth_overhead: float = MAX_DEPTH_OVERHEAD) -> ShapeReport:
+    """
+        Reports the shape of the tree, exactly or from samples descents, and calls
+        alert with the report if the tree needs a rebuild.
+    """
+    report = shape_report(tree) if samples is None else sample_shape(tree, samples)
+    if report.needs_rebuild(max_ratio, max_depth_overhead):
+        alert(report)
+    return report
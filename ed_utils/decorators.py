@@ -1,4 +1,8 @@
 import abc
+import math
+import os
+import timeit
+from functools import wraps
 
 class InvalidValueException(Exception):
     pass
@@ -125,3 +129,97 @@ class advanced(Decorator):
         """
         if saved_value is not None:
             results["name"] = "[ADV] {}".format(results["name"])
+
+class benchmark(Decorator):
+    """
+    Times the decorated test across input sizes and fits its empirical complexity.
+
+    The decorated method takes the input size n, does its setup and returns a
+    zero-argument callable, which is the operation that gets timed.
+    If bound is given, the test fails when the best fitting complexity grows
+    faster than bound.
+    Timings depend on the machine, so the test is skipped unless the ENV_VAR
+    environment variable is set, as run_tests.py --bench does.
+
+    Usage:
+        @benchmark(sizes=[1000, 4000, 16000], repeat=5, bound="log n")
+        def test_select(self, n):
+            tree = ...
+            return lambda: tree.select(n // 2)
+    """
+
+    COMPLEXITIES = [
+        ("1", lambda n: 1.0),
+        ("log n", lambda n: math.log(n)),
+        ("n", lambda n: float(n)),
+        ("n log n", lambda n: n * math.log(n)),
+        ("n^2", lambda n: float(n) ** 2),
+        ("n^3", lambda n: float(n) ** 3),
+    ]
+    # each timed repeat should run at least this long (seconds)
+    MIN_REPEAT_TIME = 0.005
+    ENV_VAR = "ED_BENCHMARKS"
+
+    def __init__(self, sizes, repeat=5, bound=None) -> None:
+        super().__init__({"sizes": list(sizes), "repeat": repeat, "bound": bound})
+
+    def validate(self, v):
+        names = [name for name, _ in self.COMPLEXITIES]
+        if len(v["sizes"]) < 2 or any(not isinstance(n, int) or n < 2 for n in v["sizes"]):
+            return "Benchmark needs at least two integer sizes of 2 or more."
+        if not isinstance(v["repeat"], int) or v["repeat"] < 1:
+            return "Repeat should be a positive integer."
+        if v["bound"] is not None and v["bound"] not in names:
+            return "Bound should be one of {}.".format(", ".join(names))
+
+    def __call__(self, func):
+        config = self.v
+
+        @wraps(func)
+        def test(test_self):
+            if not os.environ.get(self.ENV_VAR):
+                test_self.skipTest("benchmarks only run with {}=1 or run_tests.py --bench".format(self.ENV_VAR))
+            times = [self.measure(func(test_self, n), config["repeat"]) for n in config["sizes"]]
+            fitted = self.fit(config["sizes"], times)
+            config.update(times=times, complexity=fitted)
+            names = [name for name, _ in self.COMPLEXITIES]
+            if config["bound"] is not None and names.index(fitted) > names.index(config["bound"]):
+                test_self.fail("Measured scaling O({}) exceeds the declared bound O({}). Times: {}".format(
+                    fitted, config["bound"], ", ".join("{}: {:.3g}s".format(n, t) for n, t in zip(config["sizes"], times))))
+
+        setattr(test, self.get_attr_name(), config)
+        return test
+
+    @classmethod
+    def measure(cls, operation, repeat):
+        """Best time of one call to operation, over repeat timed batches."""
+        timer = timeit.Timer(operation)
+        number = 1
+        while timer.timeit(number) < cls.MIN_REPEAT_TIME:
+            number *= 2
+        return min(timer.repeat(repeat, number)) / number
+
+    @classmethod
+    def fit(cls, sizes, times):
+        """Name of the complexity whose scaled curve has the least relative error."""
+        best = None
+        for name, f in cls.COMPLEXITIES:
+            ratios = [f(n) / t for n, t in zip(sizes, times)]
+            c = sum(ratios) / sum(r * r for r in ratios)
+            error = sum((1 - c * r) ** 2 for r in ratios)
+            if best is None or error < best[0]:
+                best = (error, name)
+        return best[1]
+
+    @classmethod
+    def change_result(cls, saved_value, results:dict, output:str, err):
+        """
+        Adds the measured times and the fitted complexity to the results.
+        """
+        if saved_value is not None and "times" in saved_value:
+            results["benchmark"] = {
+                "sizes": saved_value["sizes"],
+                "times": saved_value["times"],
+                "complexity": saved_value["complexity"],
+                "bound": saved_value["bound"],
+            }
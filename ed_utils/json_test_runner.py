@@ -3,7 +3,10 @@ from __future__ import print_function
 
 import sys
 import json
+import time
 import inspect
+import tracemalloc
+import unittest
 
 from unittest import result
 from unittest.signals import registerResult
@@ -23,10 +26,31 @@ class JSONTestResult(result.TestResult):
 
     Used by JSONTestRunner.
     """
-    def __init__(self, stream, descriptions, verbosity, results):
+    def __init__(self, stream, descriptions, verbosity, results, track_memory=False):
         super(JSONTestResult, self).__init__(stream, descriptions, verbosity)
         self.descriptions = descriptions
         self.results = results
+        self.track_memory = track_memory
+        self.started_tracing = False
+        self.start_time = None
+
+    def startTestRun(self):
+        super(JSONTestResult, self).startTestRun()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def stopTestRun(self):
+        super(JSONTestResult, self).stopTestRun()
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def startTest(self, test):
+        super(JSONTestResult, self).startTest(test)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self.start_time = time.perf_counter()
 
     def getDescription(self, test):
         doc_first_line = test.shortDescription()
@@ -51,6 +75,11 @@ class JSONTestResult(result.TestResult):
             "name": self.getDescription(test),
             "ok": True,
         }
+        if self.start_time is not None:
+            # wall time in seconds and peak traced allocation in bytes
+            result["duration"] = round(time.perf_counter() - self.start_time, 6)
+        if tracemalloc.is_tracing():
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
         for dec in DECORATOR_CLASSES:
             method = getattr(test, test._testMethodName)
             val = getattr(method, dec.get_attr_name(), None)
@@ -83,15 +112,18 @@ class JSONTestRunner(object):
 
     def __init__(self, stream=sys.stdout, descriptions=True, verbosity=1,
                  failfast=False, buffer=True,
-                 stdout_visibility=None):
+                 stdout_visibility=None, track_memory=False):
         """
         Set buffer to True to include test output in JSON
+        Set track_memory to True to record the tracemalloc peak per test;
+        tracing slows every allocation down, several times over for some tests
         """
         self.stream = stream
         self.descriptions = descriptions
         self.verbosity = verbosity
         self.failfast = failfast
         self.buffer = buffer
+        self.track_memory = track_memory
         self.json_data = {
             "testcases": [],
         }
@@ -100,7 +132,7 @@ class JSONTestRunner(object):
 
     def _makeResult(self):
         return self.resultclass(self.stream, self.descriptions, self.verbosity,
-                                self.json_data["testcases"])
+                                self.json_data["testcases"], self.track_memory)
 
     def run(self, test):
         "Run the given test case or test suite."
@@ -121,3 +153,30 @@ class JSONTestRunner(object):
         json.dump(self.json_data, self.stream, indent=4)
         self.stream.write('\n')
         return result
+
+
+def run_test_id(test_id, track_memory=False):
+    """Runs the test with the given id in this process and returns its JSON results."""
+    suite = unittest.defaultTestLoader.loadTestsFromName(test_id)
+    results = []
+    result = JSONTestResult(None, True, 1, results, track_memory)
+    result.buffer = True
+    result.startTestRun()
+    try:
+        suite(result)
+    finally:
+        result.stopTestRun()
+    return results
+
+
+def run_parallel(test_ids, jobs, track_memory=False):
+    """Shards the tests across a pool of jobs processes.
+
+    Returns the JSON results of every test, in the order of test_ids.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        run = partial(run_test_id, track_memory=track_memory)
+        return [r for results in pool.map(run, test_ids) for r in results]
@@ -8,7 +8,35 @@ def do_stuff(q1, a, k, method):
     except Exception as e:
         q1.put(e)
 
-def timeout(sec=300):
+def do_stuff_in_process(conn, a, k, method):
+    try:
+        conn.send((True, method(*a, **k)))
+    except Exception as e:
+        try:
+            conn.send((False, e))
+        except Exception:
+            # the exception itself could not be pickled
+            conn.send((False, RuntimeError(repr(e))))
+    finally:
+        conn.close()
+
+def timeout(sec=300, mode="thread"):
+    """
+    Fails the test with TimeoutError after sec seconds.
+
+    mode="thread" runs the test in a daemon thread, which is left running on timeout.
+    mode="process" runs it in a forked child instead and kills the child on timeout,
+    so runaway work stops using CPU. The result or exception comes back through a pipe
+    and has to be picklable. Side effects in the child (e.g. on self) are not seen by
+    the caller. Falls back to "thread" where fork is unavailable.
+    """
+    if mode not in ("thread", "process"):
+        raise ValueError("mode should be 'thread' or 'process'.")
+    if mode == "process":
+        import multiprocessing
+        if "fork" not in multiprocessing.get_all_start_methods():
+            mode = "thread"
+
     def timeout_dec(func):
         @wraps(func)
         def test(*args, **kwargs):
@@ -25,5 +53,32 @@ def timeout(sec=300):
                 if isinstance(x, Exception):
                     raise x
                 return x
-        return test
+
+        @wraps(func)
+        def test_in_process(*args, **kwargs):
+            # fork, not a reused pool worker: the test and its arguments are not
+            # picklable, but a forked child inherits them without any pickling
+            import multiprocessing
+            ctx = multiprocessing.get_context("fork")
+            receiver, sender = ctx.Pipe(duplex=False)
+            p = ctx.Process(target=do_stuff_in_process, args=[sender, args, kwargs, func], daemon=True)
+            p.start()
+            sender.close()
+            try:
+                if not receiver.poll(sec):
+                    p.kill()
+                    raise TimeoutError(f"Timed out after {sec} seconds")
+                try:
+                    ok, x = receiver.recv()
+                except EOFError:
+                    p.join()
+                    raise RuntimeError(f"Test process exited with code {p.exitcode}")
+            finally:
+                receiver.close()
+                p.join()
+            if not ok:
+                raise x
+            return x
+
+        return test_in_process if mode == "process" else test
     return timeout_dec
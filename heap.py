@@ -3,7 +3,8 @@ from __future__ import annotations
 __author__ = "Brendon Taylor, modified by Jackson Goerner"
 __docformat__ = 'reStructuredText'
 
-from typing import Generic
+from typing import Generic, List
+from heapq import heappush, heappop
 from referential_array import ArrayR, T
 
 
@@ -90,6 +91,77 @@ class MaxHeap(Generic[T]):
             self.sink(1)
         return max_elt
 
+    def peek_max(self) -> T:
+        """ Return the maximum element without removing it.
+            :complexity: O(1)
+        """
+        if self.length == 0:
+            raise IndexError
+        return self.the_array[1]
+
+    def top_k(self, k: int) -> List[T]:
+        """ Return the k largest elements, largest first, without changing the heap.
+            :complexity: O(k log k), independent of the size of the heap
+        """
+        return top_k_across([self], k)
+
+    def computed_value(self, k: int) -> int:
+        """ Returns the value the heap is ordered by for the element at index k. """
+        item = self.the_array[k]
+        return min(item.capacity, item.volume) * item.nutrient_factor
+
+    def heapify(self) -> None:
+        """ Restores the heap property over the_array[1..length] bottom-up.
+            :complexity: O(N) where N is the number of elements
+        """
+        for k in range(self.length // 2, 0, -1):
+            self.sink(k)
+
+    def meld(self, other: MaxHeap[T]) -> None:
+        """ Moves every element of other into this heap, growing it if needed.
+            The elements are block-copied after this heap's and the result is
+            heapified, instead of adding them one by one. other is left empty:
+            the elements now belong to this heap, so that changes made to them
+            through it cannot break the heap property of other.
+            :pre: other is not this heap
+            :complexity: O(N + M) where N and M are the sizes of the heaps
+        """
+        if other is self:
+            raise ValueError("Cannot meld a heap with itself.")
+        total = self.length + other.length
+        if total + 1 > len(self.the_array):
+            new_array = ArrayR(total + 1)
+            new_array.copy_from(self.the_array, 1, 1, self.length)
+            self.the_array = new_array
+        self.the_array.copy_from(other.the_array, 1, self.length + 1, other.length)
+        self.length = total
+        self.heapify()
+        other.the_array.fill(None, 1, other.length + 1)
+        other.length = 0
+
+
+def top_k_across(heaps: List[MaxHeap[T]], k: int) -> List[T]:
+    """ Returns the k largest elements over all the heaps, largest first,
+        without changing any of them.
+        A small auxiliary heap holds the frontier: the candidates whose parents
+        have already been taken. Only the children of taken elements can be next.
+        :complexity: O(H + k log(H + k)) where H is the number of heaps
+    """
+    frontier = []
+    for h, heap in enumerate(heaps):
+        if len(heap) > 0:
+            heappush(frontier, (-heap.computed_value(1), h, 1))
+    result = []
+    while frontier and len(result) < k:
+        _, h, i = heappop(frontier)
+        heap = heaps[h]
+        result.append(heap.the_array[i])
+        for child in (2 * i, 2 * i + 1):
+            if child <= heap.length:
+                heappush(frontier, (-heap.computed_value(child), h, child))
+    return result
+
+
 if __name__ == '__main__':
     items = [ int(x) for x in input('Enter a list of numbers: ').strip().split() ]
     heap = MaxHeap(len(items))
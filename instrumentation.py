@@ -0,0 +1,273 @@
+""" Opt-in instrumentation for BinarySearchTree, ThreeDeeBeeTree and MaxHeap.
+    While an instrument() block is open, counting variants of the hot methods
+    are bound onto that one instance, shadowing the class methods; they are
+    removed when the block exits. The classes are never changed, so a structure
+    that is not instrumented runs exactly the same code as before, without a
+    single extra branch.
+"""
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterator
+
+from bst import BinarySearchTree
+from heap import MaxHeap
+from threedeebeetree import ThreeDeeBeeTree
+
+
+@dataclass
+class Stats:
+    """
+        Counters gathered while a structure is instrumented.
+        An operation is one descent of a tree (lookup, insertion or deletion) or
+        one sift of a heap. Its depth is the number of nodes on the search path,
+        or the number of levels the element moved.
+    """
+
+    operations: int = 0
+    comparisons: int = 0
+    node_visits: int = 0
+    sift_steps: int = 0
+    rebuilds: int = 0
+    max_depth: int = 0
+    total_depth: int = 0
+
+    def record(self, depth: int) -> None:
+        """ Records one finished operation that reached the given depth. """
+        self.operations += 1
+        self.total_depth += depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def snapshot(self) -> Dict[str, float]:
+        """ Returns the counters as a dict, with the average depth per operation. """
+        stats = asdict(self)
+        stats['average_depth'] = self.total_depth / self.operations if self.operations else 0.0
+        return stats
+
+    def reset(self) -> None:
+        """ Zeroes every counter. """
+        for name, value in asdict(Stats()).items():
+            setattr(self, name, value)
+
+
+class CountingKey:
+    """
+        Wraps a search key and counts every comparison made against it.
+        Indexing returns a counting wrapper of the component, so the per-coordinate
+        comparisons of ThreeDeeBeeTree points are counted too.
+    """
+
+    __slots__ = ('key', 'stats')
+
+    def __init__(self, key, stats: Stats) -> None:
+        self.key = key
+        self.stats = stats
+
+    def __lt__(self, other) -> bool:
+        self.stats.comparisons += 1
+        return self.key < other
+
+    def __le__(self, other) -> bool:
+        self.stats.comparisons += 1
+        return self.key <= other
+
+    def __gt__(self, other) -> bool:
+        self.stats.comparisons += 1
+        return self.key > other
+
+    def __ge__(self, other) -> bool:
+        self.stats.comparisons += 1
+        return self.key >= other
+
+    def __eq__(self, other) -> bool:
+        self.stats.comparisons += 1
+        return self.key == other
+
+    def __ne__(self, other) -> bool:
+        self.stats.comparisons += 1
+        return self.key != other
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __getitem__(self, i) -> CountingKey:
+        return CountingKey(self.key[i], self.stats)
+
+    def __repr__(self) -> str:
+        return repr(self.key)
+
+    def __format__(self, spec: str) -> str:
+        return format(self.key, spec)
+
+
+class CountingArray:
+    """ Wraps the array of a heap and counts the writes into it. """
+
+    def __init__(self, base) -> None:
+        self.base = base
+        self.writes = 0
+        self.last_write = 0
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    def __getitem__(self, index):
+        return self.base[index]
+
+    def __setitem__(self, index, value) -> None:
+        self.writes += 1
+        self.last_write = index
+        self.base[index] = value
+
+    def __getattr__(self, name):
+        return getattr(self.base, name)
+
+
+def counting_descents(stats: Stats) -> Callable[[Callable], Callable]:
+    """
+        Returns a wrapper for the recursive descents of one tree, method(current, key, ...).
+        The key is wrapped in a CountingKey on the way down, and unwrapped once the
+        descent falls off the tree, so that an inserted node stores the real key.
+        The descents wrapped with it share one depth: a descent that calls another
+        counts as a single operation.
+    """
+    depth = 0
+    path = 0
+
+    def wrap(method: Callable) -> Callable:
+        def descend(current, key, *args):
+            nonlocal depth, path
+            if depth == 0:
+                path = 0
+                key = CountingKey(key, stats)
+            if current is None:
+                key = key.key
+            else:
+                stats.node_visits += 1
+                path += 1
+            depth += 1
+            try:
+                return method(current, key, *args)
+            finally:
+                depth -= 1
+                if depth == 0:
+                    stats.record(path)
+        return descend
+    return wrap
+
+
+def counting_visits(stats: Stats, method: Callable) -> Callable:
+    """ Wraps a recursive helper method(current) so that each call counts as a node visit. """
+    def visit(current):
+        stats.node_visits += 1
+        return method(current)
+    return visit
+
+
+def tree_variants(tree: BinarySearchTree | ThreeDeeBeeTree, stats: Stats) -> Dict[str, Callable]:
+    """ Counting variants of the methods of a BinarySearchTree or ThreeDeeBeeTree. """
+    descending = counting_descents(stats)
+    variants = {
+        'get_tree_node_by_key_aux': descending(tree.get_tree_node_by_key_aux),
+        'insert_aux': descending(tree.insert_aux),
+    }
+    if isinstance(tree, BinarySearchTree):
+        variants['delete_aux'] = descending(tree.delete_aux)
+        # the successor search of a deletion
+        variants['get_minimal_aux'] = counting_visits(stats, tree.get_minimal_aux)
+        variants['delete_minimal_aux'] = counting_visits(stats, tree.delete_minimal_aux)
+    return variants
+
+
+def heap_variants(heap: MaxHeap, stats: Stats) -> Dict[str, Callable]:
+    """
+        Counting variants of the methods of a MaxHeap. The sift steps are the moves
+        into the array made by rise and sink, less the final placement of the element.
+    """
+    array = CountingArray(heap.the_array)
+    heap.the_array = array
+    rise, sink, largest_child, heapify = heap.rise, heap.sink, heap.largest_child, heap.heapify
+
+    def watch() -> None:
+        # meld may move the elements into a new array, which is then wrapped instead
+        if heap.the_array is not array:
+            array.base = heap.the_array
+            heap.the_array = array
+        array.writes = 0
+
+    def sifted() -> int:
+        steps = array.writes - 1
+        array.writes = 0
+        stats.sift_steps += steps
+        stats.record(steps)
+        return steps
+
+    def counting_rise(k: int) -> None:
+        watch()
+        rise(k)
+        # one comparison per step, and one more unless the element reached the root
+        stats.comparisons += sifted() + (array.last_write > 1)
+
+    def counting_sink(k: int) -> None:
+        watch()
+        sink(k)
+        sifted()
+
+    def counting_largest_child(k: int) -> int:
+        # against the parent, and between the children when there are two
+        stats.comparisons += 1 + (2 * k != heap.length)
+        return largest_child(k)
+
+    def counting_heapify() -> None:
+        stats.rebuilds += 1
+        watch()
+        heapify()
+
+    return {
+        'rise': counting_rise,
+        'sink': counting_sink,
+        'largest_child': counting_largest_child,
+        'heapify': counting_heapify,
+    }
+
+
+@contextmanager
+def instrument(structure: BinarySearchTree | ThreeDeeBeeTree | MaxHeap,
+               stats: Stats | None = None) -> Iterator[Stats]:
+    """
+        Counts the work done on structure inside the with block:
+
+            with instrument(tree) as stats:
+                tree[key] = item
+            print(stats.snapshot())
+
+        Pass stats to keep adding to existing counters. Lookups, insertions and
+        deletions are counted on trees; rise, sink and heapify on heaps. None of the
+        engines rotate, so rebuilds only counts heapify (including through meld).
+        :raises TypeError: if structure is not one of the supported engines
+        :raises RuntimeError: if structure is already instrumented
+    """
+    stats = Stats() if stats is None else stats
+    if isinstance(structure, MaxHeap):
+        make_variants = heap_variants
+    elif isinstance(structure, (BinarySearchTree, ThreeDeeBeeTree)):
+        make_variants = tree_variants
+    else:
+        raise TypeError('Cannot instrument {0}'.format(type(structure).__name__))
+    if isinstance(getattr(structure, 'the_array', None), CountingArray) \
+            or 'insert_aux' in vars(structure):
+        raise RuntimeError('Already instrumented')
+
+    variants = make_variants(structure, stats)
+    vars(structure).update(variants)
+    try:
+        yield stats
+    finally:
+        for name in variants:
+            del vars(structure)[name]
+        if isinstance(getattr(structure, 'the_array', None), CountingArray):
+            structure.the_array = structure.the_array.base
@@ -0,0 +1,133 @@
+""" KLL quantile sketch.
+    Keeps a hierarchy of compactors; an item stored at level h stands for 2**h
+    points of the stream. Memory stays around k * log(n / k) items for a
+    stream of n points, and sketches over disjoint streams can be merged.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from math import ceil
+from random import Random
+from typing import Generic, TypeVar, List, Tuple
+
+T = TypeVar('T')
+
+
+class KLLSketch(Generic[T]):
+    """ Mergeable streaming quantile sketch (Karnin, Lang and Liberty). """
+
+    # capacity shrinks by this factor for every level below the top
+    DECAY = 2 / 3
+    MIN_CAPACITY = 2
+
+    def __init__(self, epsilon: float = 0.01, seed: int | None = None) -> None:
+        """
+            Creates an empty sketch whose rank error is about epsilon * n.
+            :complexity: O(1)
+            :pre: 0 < epsilon < 1
+        """
+        if not 0 < epsilon < 1:
+            raise ValueError("epsilon should be between 0 and 1.")
+        self.epsilon = epsilon
+        # empirical KLL bound: normalised rank error is about 1.65 / k
+        self.k = max(8, ceil(1.65 / epsilon))
+        self.compactors = [[]]
+        self.size = 0
+        self.max_size = self.capacity(0)
+        self.n = 0
+        self.random = Random(seed)
+        self.cdf = None
+
+    def __len__(self) -> int:
+        """ Returns the number of points summarised by the sketch. """
+        return self.n
+
+    def capacity(self, level: int) -> int:
+        """ Number of items level may hold before it is compacted. """
+        height = len(self.compactors)
+        return max(self.MIN_CAPACITY, ceil(self.k * self.DECAY ** (height - level - 1)))
+
+    def add(self, item: T) -> None:
+        """
+            Adds a point to the sketch.
+            :complexity: O(1) amortised, plus an O(k log k) compaction every O(k) adds
+        """
+        self.compactors[0].append(item)
+        self.size += 1
+        self.n += 1
+        self.cdf = None
+        if self.size >= self.max_size:
+            self.compress()
+
+    def compress(self) -> None:
+        """
+            Compacts the lowest full level: its items are sorted and every other
+            one is promoted to the next level with doubled weight.
+        """
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) >= self.capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                items = sorted(self.compactors[level])
+                # an odd item out stays behind so no weight is lost
+                keep = [items.pop()] if len(items) % 2 else []
+                self.compactors[level + 1].extend(items[self.random.randint(0, 1)::2])
+                self.compactors[level] = keep
+                break
+        self.size = sum(len(c) for c in self.compactors)
+        self.max_size = sum(self.capacity(level) for level in range(len(self.compactors)))
+
+    def merge(self, other: KLLSketch[T]) -> None:
+        """
+            Folds another sketch into this one; the result summarises both streams.
+            :complexity: O(S log S) where S is the combined number of stored items
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.n += other.n
+        self.cdf = None
+        self.size = sum(len(c) for c in self.compactors)
+        self.max_size = sum(self.capacity(level) for level in range(len(self.compactors)))
+        while self.size >= self.max_size:
+            self.compress()
+
+    def weighted_items(self) -> Tuple[List[T], List[int]]:
+        """
+            Returns the stored items in order, and the cumulative weight up to and
+            including each one. Cached until the sketch changes.
+            :complexity: O(S log S) where S is the number of stored items
+        """
+        if self.cdf is None:
+            pairs = sorted(
+                (item, 1 << level)
+                for level, items in enumerate(self.compactors)
+                for item in items
+            )
+            self.cdf = ([item for item, _ in pairs], list(accumulate(weight for _, weight in pairs)))
+        return self.cdf
+
+    def rank(self, item: T, inclusive: bool = False) -> int:
+        """
+            Estimates how many points are smaller than (or, if inclusive, equal to) item.
+            :complexity: O(log S) once the cumulative weights are cached
+        """
+        values, cumulative = self.weighted_items()
+        i = bisect_right(values, item) if inclusive else bisect_left(values, item)
+        return cumulative[i - 1] if i else 0
+
+    def quantile(self, q: float) -> T:
+        """
+            Estimates the point ranked q * n (0 <= q <= 1).
+            :complexity: O(log S) once the cumulative weights are cached
+        """
+        if self.n == 0:
+            raise IndexError('Quantile of an empty sketch')
+        values, cumulative = self.weighted_items()
+        i = bisect_left(cumulative, q * cumulative[-1])
+        return values[min(i, len(values) - 1)]
@@ -0,0 +1,221 @@
+""" Morton (Z-order) index for 3D integer points.
+    Interleaves the bits of x, y and z into a single integer code and keeps
+    the points in parallel sorted arrays, so lookups are binary searches and
+    box queries walk contiguous runs of the Z-curve.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from bisect import bisect_left, bisect_right
+from typing import Generic, TypeVar, Iterable, List, Tuple
+from threedeebeetree import Point
+
+I = TypeVar('I')
+
+# bits per axis; codes fit in a 63 bit integer
+BITS = 21
+OFFSET = 1 << (BITS - 1)
+TOTAL_BITS = 3 * BITS
+
+# masks of the bits belonging to the same axis strictly below each bit
+_LOWER_SAME_AXIS = [
+    sum(1 << b for b in range(bit - 3, -1, -3)) for bit in range(TOTAL_BITS)
+]
+
+
+def _spread(v: int) -> int:
+    """ Spreads the low BITS bits of v so there are two zero bits between each. """
+    v &= (1 << BITS) - 1
+    v = (v | (v << 32)) & 0x1F00000000FFFF
+    v = (v | (v << 16)) & 0x1F0000FF0000FF
+    v = (v | (v << 8)) & 0x100F00F00F00F00F
+    v = (v | (v << 4)) & 0x10C30C30C30C30C3
+    v = (v | (v << 2)) & 0x1249249249249249
+    return v
+
+
+def _compact(v: int) -> int:
+    """ Inverse of _spread. """
+    v &= 0x1249249249249249
+    v = (v ^ (v >> 2)) & 0x10C30C30C30C30C3
+    v = (v ^ (v >> 4)) & 0x100F00F00F00F00F
+    v = (v ^ (v >> 8)) & 0x1F0000FF0000FF
+    v = (v ^ (v >> 16)) & 0x1F00000000FFFF
+    v = (v ^ (v >> 32)) & 0x1FFFFF
+    return v
+
+
+def morton_encode(point: Point) -> int:
+    """
+        Interleaves the coordinates of point into a Morton code.
+        Coordinates must lie in [-2**20, 2**20).
+        :complexity: O(1)
+    """
+    x, y, z = point
+    if not (-OFFSET <= x < OFFSET and -OFFSET <= y < OFFSET and -OFFSET <= z < OFFSET):
+        raise ValueError('Point out of range for Morton encoding: {0}'.format(point))
+    return _spread(x + OFFSET) << 2 | _spread(y + OFFSET) << 1 | _spread(z + OFFSET)
+
+
+def morton_decode(code: int) -> Point:
+    """
+        Recovers the point encoded by morton_encode.
+        :complexity: O(1)
+    """
+    return (
+        _compact(code >> 2) - OFFSET,
+        _compact(code >> 1) - OFFSET,
+        _compact(code) - OFFSET,
+    )
+
+
+def _in_box(code: int, zmin: int, zmax: int) -> bool:
+    """ Checks whether the point behind code lies in the box spanned by zmin and zmax. """
+    for shift in (2, 1, 0):
+        v = _compact(code >> shift)
+        if v < _compact(zmin >> shift) or v > _compact(zmax >> shift):
+            return False
+    return True
+
+
+def _bigmin(code: int, zmin: int, zmax: int) -> int:
+    """
+        Smallest code larger than code whose point lies inside the box
+        spanned by zmin and zmax (Tropf and Herzog's BIGMIN).
+        :pre: zmin < code < zmax and code lies outside of the box
+        :complexity: O(B) where B is the number of bits in a code
+    """
+    bigmin = zmax
+    for bit in range(TOTAL_BITS - 1, -1, -1):
+        mask = 1 << bit
+        below = _LOWER_SAME_AXIS[bit]
+        c, lo, hi = code & mask, zmin & mask, zmax & mask
+        if not c and not lo and hi:
+            bigmin = (zmin & ~below) | mask
+            zmax = (zmax | below) & ~mask
+        elif not c and lo and hi:
+            return zmin
+        elif c and not lo and not hi:
+            return bigmin
+        elif c and not lo and hi:
+            zmin = (zmin & ~below) | mask
+    return bigmin
+
+
+class MortonTree(Generic[I]):
+    """ Point index over Morton codes stored in sorted parallel arrays. """
+
+    def __init__(self) -> None:
+        """
+            Initialises an empty index
+            :complexity: O(1)
+        """
+        self.codes = []
+        self.keys = []
+        self.items = []
+        self.length = 0
+
+    @classmethod
+    def from_points(cls, pairs: Iterable[Tuple[Point, I]]) -> MortonTree[I]:
+        """
+            Bulk loads (point, item) pairs with a single sort.
+            Later pairs replace earlier ones with the same point.
+            :complexity: O(N log N) where N is the number of pairs
+        """
+        tree = cls()
+        last = {}
+        for key, item in pairs:
+            last[morton_encode(key)] = (key, item)
+        tree.codes = sorted(last)
+        tree.keys = [last[code][0] for code in tree.codes]
+        tree.items = [last[code][1] for code in tree.codes]
+        tree.length = len(tree.codes)
+        return tree
+
+    def is_empty(self) -> bool:
+        """
+            Checks to see if the index is empty
+            :complexity: O(1)
+        """
+        return self.length == 0
+
+    def __len__(self) -> int:
+        """ Returns the number of points in the index. """
+        return self.length
+
+    def _index_of(self, key: Point) -> int:
+        """
+            Returns the position of key in the arrays.
+            :complexity: O(log N)
+        """
+        code = morton_encode(key)
+        i = bisect_left(self.codes, code)
+        if i == self.length or self.codes[i] != code:
+            raise KeyError('Key not found: {0}'.format(key))
+        return i
+
+    def __contains__(self, key: Point) -> bool:
+        """
+            Checks to see if the key is in the index
+            :complexity: see __getitem__(self, key: Point) -> I
+        """
+        try:
+            self._index_of(key)
+        except KeyError:
+            return False
+        else:
+            return True
+
+    def __getitem__(self, key: Point) -> I:
+        """
+            Attempts to get an item in the index by binary search over the codes
+            :complexity: O(log N) where N is the number of points
+        """
+        return self.items[self._index_of(key)]
+
+    def __setitem__(self, key: Point, item: I) -> None:
+        """
+            Inserts the item at key, replacing the item of an existing key
+            :complexity best: O(log N) when the key is already present
+            :complexity worst: O(N) shifting the arrays to make room
+        """
+        code = morton_encode(key)
+        i = bisect_left(self.codes, code)
+        if i < self.length and self.codes[i] == code:
+            self.items[i] = item
+            return
+        self.codes.insert(i, code)
+        self.keys.insert(i, key)
+        self.items.insert(i, item)
+        self.length += 1
+
+    def range_query(self, lo: Point, hi: Point) -> List[Tuple[Point, I]]:
+        """
+            Returns the (point, item) pairs inside the box lo <= point <= hi
+            (inclusive on every axis), in Z-order.
+            Runs of codes outside of the box are skipped by jumping to BIGMIN.
+            :complexity: O((R + J) * log N) where R is the number of results
+            and J the number of jumps out of and back into the box
+        """
+        zmin = morton_encode(tuple(min(a, b) for a, b in zip(lo, hi)))
+        zmax = morton_encode(tuple(max(a, b) for a, b in zip(lo, hi)))
+        result = []
+        i = bisect_left(self.codes, zmin)
+        end = bisect_right(self.codes, zmax)
+        while i < end:
+            code = self.codes[i]
+            if _in_box(code, zmin, zmax):
+                result.append((self.keys[i], self.items[i]))
+                i += 1
+            else:
+                i = bisect_left(self.codes, _bigmin(code, zmin, zmax), i + 1, end)
+        return result
+
+    def range_count(self, lo: Point, hi: Point) -> int:
+        """
+            Counts the points inside the box lo <= point <= hi.
+            :complexity: see range_query
+        """
+        return len(self.range_query(lo, hi))
@@ -21,6 +21,8 @@ class TreeNode(Generic[K, I]):
     right: TreeNode | None = None
     # This value should be maintained by yourself in bst.py
     subtree_size: int = 1
+    # Multiplicity of the key in multiset trees; subtree_size counts every copy
+    count: int = 1
 
     def set_subtree_size(self, subtree_size: int) -> None:
         self.subtree_size = subtree_size
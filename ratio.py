@@ -1,33 +1,302 @@
 from __future__ import annotations
-from typing import Generic, TypeVar
-from math import ceil, floor
-from bst import BinarySearchTree
+from typing import Generic, TypeVar, Callable, Iterable, List, Tuple
+from bisect import bisect_right
+from collections import deque
+from math import ceil
+from time import monotonic
+from bst import BinarySearchTree, DUPLICATES_COUNT
 
 T = TypeVar("T")
 I = TypeVar("I")
 
 class Percentiles(Generic[T]):
 
-    def __init__(self) -> None:
-        self.our_adt = BinarySearchTree()
+    def __init__(self, backend: Callable[[str], BinarySearchTree] = BinarySearchTree) -> None:
+        """
+        backend builds the order-statistics tree holding the points from a duplicates
+        policy; the tree counts repeated points. Use PersistentBinarySearchTree to be
+        able to take snapshots, or btree.BTree for a cache-friendly B+-tree.
+        """
+        self.our_adt = backend(DUPLICATES_COUNT)
+        # bumped by every change to the points; cached answers belong to one version
+        self.version = 0
+        self.cache = {}
+        self.cache_version = 0
     
     def add_point(self, item: T):
         self.our_adt[item] = item
+        self.version += 1
     
     def remove_point(self, item: T):
-        del self.our_adt[self.our_adt[item]]
+        """
+        Removes one copy of item.
+        Complexity: O(D) where D is the depth of the tree (a single descent)
+        :raises KeyError: if item is not one of the points
+        """
+        try:
+            del self.our_adt[item]
+        except ValueError:
+            # the trees report a missing key on deletion as a ValueError
+            raise KeyError('Point not found: {0}'.format(item)) from None
+        self.version += 1
 
-    def ratio(self, x, y):
-
-        return_list = []
+    def ratio_bounds(self, x, y) -> Tuple[int, int]:
+        """
+        Returns the ranks (1-indexed, inclusive) of the first and last point above the
+        x-th and below the (100 - y)-th percentile; lo > hi if there is none.
+        Complexity: O(1)
+        """
         length_percent = 100/self.our_adt.length
         x_index = 1 + ceil(x/length_percent)
         y_index = self.our_adt.length - ceil(y/length_percent)
+        return max(x_index, 1), min(y_index, self.our_adt.length)
 
-        for i in range(x_index, y_index + 1):
-            return_list.append(self.our_adt.kth_smallest(i, self.our_adt.root).key)
-        return return_list
+    def ratio(self, x, y):
+        """
+        Returns the points that are above the x-th and below the (100 - y)-th percentile.
+        Both boundaries are turned into ranks, and the points between them are read with
+        one descent and an in-order walk.
+        Complexity: O(D + R) where D is the depth of the tree and R the number of points returned
+        """
+        return self.our_adt.select_range(*self.ratio_bounds(x, y))
+
+    def cached(self) -> dict:
+        """ Returns the cache of answers, emptied first if the points have changed since. """
+        if self.cache_version != self.version:
+            self.cache = {}
+            self.cache_version = self.version
+        return self.cache
+
+    def ratio_many(self, pairs: Iterable[Tuple[float, float]]) -> List[List[T]]:
+        """
+        Returns ratio(x, y) for each (x, y) pair, in order.
+        The rank ranges of all the pairs are merged where they overlap, and each merged
+        range is read with one descent and one in-order walk, so points shared by
+        several answers are only visited once. Answers are cached until the points change.
+        Complexity: O(Q log Q + U * D + R) for Q pairs, where U is the number of merged
+        ranges, D the depth of the tree and R the number of points returned
+        """
+        pairs = [tuple(pair) for pair in pairs]
+        cache = self.cached()
+        bounds = {pair: self.ratio_bounds(*pair) for pair in pairs if ('ratio', pair) not in cache}
+        merged = []
+        for lo, hi in sorted(b for b in bounds.values() if b[0] <= b[1]):
+            if merged and lo <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        starts = [lo for lo, _ in merged]
+        walks = [self.our_adt.select_range(lo, hi) for lo, hi in merged]
+        for pair, (lo, hi) in bounds.items():
+            if lo > hi:
+                cache['ratio', pair] = []
+            else:
+                i = bisect_right(starts, lo) - 1
+                cache['ratio', pair] = walks[i][lo - starts[i]:hi - starts[i] + 1]
+        return [list(cache['ratio', pair]) for pair in pairs]
+
+    def quantiles(self, percents: Iterable[float]) -> List[T]:
+        """
+        Returns the point at each percentile p (0 <= p <= 100), in order: the point
+        ranked ceil(p * n / 100), or the smallest point for p = 0.
+        All the ranks are answered by one shared descent, see select_many of the tree.
+        Answers are cached until the points change.
+        Complexity: O(Q log Q + P) for Q percentiles, where P is the number of nodes on
+        the union of their search paths
+        :raises ValueError: if a percentile is not between 0 and 100
+        """
+        percents = list(percents)
+        if any(not 0 <= p <= 100 for p in percents):
+            raise ValueError("Percentiles should be between 0 and 100.")
+        cache = self.cached()
+        length = self.our_adt.length
+        ranks = {p: max(1, ceil(p * length / 100)) for p in percents if ('quantile', p) not in cache}
+        wanted = sorted(set(ranks.values()))
+        found = dict(zip(wanted, self.our_adt.select_many(wanted)))
+        for p, rank in ranks.items():
+            cache['quantile', p] = found[rank]
+        return [cache['quantile', p] for p in percents]
+
+    def percentile(self, item: T) -> float:
+        """
+        Returns the percentage of points strictly smaller than item.
+        Complexity: O(D) where D is the depth of the tree
+        """
+        return 100 * self.our_adt.rank(item) / self.our_adt.length
+
+    def snapshot(self) -> Percentiles[T]:
+        """
+        Returns a read-only Percentiles over the points as they are now. Readers can
+        query it without locks while this one keeps changing.
+        Requires a persistent backend.
+        Complexity: O(1)
+        """
+        view = Percentiles.__new__(Percentiles)
+        view.our_adt = self.our_adt.snapshot()
+        view.version = view.cache_version = 0
+        view.cache = {}
+        return view
+
+
+class WindowedPercentiles(Percentiles[T]):
+    """
+    Percentiles over the most recent points only.
+    Points expire once more than max_points newer ones have been added, or once they
+    are older than max_age (measured with clock). Insertion order is kept in a ring
+    buffer next to the tree. Expired points are evicted in batches of evict_batch on
+    add, and all of them are flushed before any query.
+    """
+
+    def __init__(self, max_points: int | None = None, max_age: float | None = None,
+                 evict_batch: int = 64, clock: Callable[[], float] = monotonic,
+                 backend: Callable[[str], BinarySearchTree] = BinarySearchTree) -> None:
+        if max_points is None and max_age is None:
+            raise ValueError("Either max_points or max_age should be given.")
+        super().__init__(backend)
+        self.max_points = max_points
+        self.max_age = max_age
+        self.evict_batch = max(1, evict_batch)
+        self.clock = clock
+        # (timestamp, item) pairs, oldest first
+        self.window = deque()
+
+    def add_point(self, item: T):
+        """
+        Complexity: O(D) for the insertion, plus O(D) per evicted point
+        """
+        now = self.clock()
+        super().add_point(item)
+        self.window.append((now, item))
+        if self.pending_expiry(now) >= self.evict_batch:
+            self.expire(now)
+
+    def remove_point(self, item: T):
+        """
+        Removes a point before it expires.
+        Complexity: O(D + N) where N is the number of points in the window
+        """
+        super().remove_point(item)
+        for i, (_, other) in enumerate(self.window):
+            if other == item:
+                del self.window[i]
+                break
+
+    def pending_expiry(self, now: float) -> int:
+        """
+        Returns how many points have expired (capped at evict_batch once the
+        age limit is involved). Timestamps are ordered, so the age check only
+        looks at the evict_batch-th oldest point.
+        Complexity: O(1)
+        """
+        overflow = 0
+        if self.max_points is not None:
+            overflow = max(0, len(self.window) - self.max_points)
+        if self.max_age is not None and overflow < self.evict_batch <= len(self.window):
+            if now - self.window[self.evict_batch - 1][0] > self.max_age:
+                overflow = self.evict_batch
+        return overflow
+
+    def expire(self, now: float | None = None):
+        """
+        Evicts every expired point.
+        Complexity: O(E * D) where E is the number of evicted points
+        """
+        if now is None:
+            now = self.clock()
+        while self.window and (
+                (self.max_points is not None and len(self.window) > self.max_points) or
+                (self.max_age is not None and now - self.window[0][0] > self.max_age)):
+            _, item = self.window.popleft()
+            del self.our_adt[item]
+            self.version += 1
+
+    def ratio(self, x, y):
+        self.expire()
+        return super().ratio(x, y)
 
+    def ratio_many(self, pairs: Iterable[Tuple[float, float]]) -> List[List[T]]:
+        self.expire()
+        return super().ratio_many(pairs)
+
+    def quantiles(self, percents: Iterable[float]) -> List[T]:
+        self.expire()
+        return super().quantiles(percents)
+
+    def percentile(self, item: T) -> float:
+        self.expire()
+        return super().percentile(item)
+
+    def snapshot(self) -> Percentiles[T]:
+        """ See Percentiles.snapshot; expired points are evicted first, so the
+        snapshot only holds the current window.
+        """
+        self.expire()
+        return super().snapshot()
+
+
+class ApproxPercentiles(Generic[T]):
+    """
+    Bounded-memory Percentiles over KLL sketches.
+    Ranks are accurate to about epsilon * n. Removals go into a second sketch,
+    whose estimated ranks are subtracted from those of the added points.
+    """
+
+    def __init__(self, epsilon: float = 0.01, seed: int | None = None) -> None:
+        # kll (and random) are only loaded once a sketch is needed
+        from kll import KLLSketch
+        self.added = KLLSketch(epsilon, seed)
+        self.removed = KLLSketch(epsilon, None if seed is None else seed + 1)
+
+    def __len__(self) -> int:
+        return len(self.added) - len(self.removed)
+
+    def add_point(self, item: T):
+        """
+        Complexity: O(1) amortised, see KLLSketch.add
+        """
+        self.added.add(item)
+
+    def remove_point(self, item: T):
+        """
+        Records the removal of a point that was previously added.
+        Complexity: O(1) amortised, see KLLSketch.add
+        """
+        self.removed.add(item)
+
+    def merge(self, other: ApproxPercentiles[T]):
+        """
+        Folds in the summary of another shard.
+        Complexity: see KLLSketch.merge
+        """
+        self.added.merge(other.added)
+        self.removed.merge(other.removed)
+
+    def rank(self, item: T, inclusive: bool = False) -> int:
+        """ Estimated number of current points smaller than (or equal to) item. """
+        return self.added.rank(item, inclusive) - self.removed.rank(item, inclusive)
+
+    def percentile(self, item: T) -> float:
+        """ Estimated percentage of points strictly smaller than item. """
+        return 100 * self.rank(item) / len(self)
+
+    def ratio(self, x, y):
+        """
+        Returns the retained sample points whose estimated rank lies above the x-th
+        and below the (100 - y)-th percentile, in order. Each returned point stands
+        for a group of nearby points of the stream.
+        Complexity: O(S log S) where S is the number of items stored in the sketches
+        """
+        length = len(self)
+        length_percent = 100/length
+        x_index = 1 + ceil(x/length_percent)
+        y_index = length - ceil(y/length_percent)
+
+        values, _ = self.added.weighted_items()
+        return_list = []
+        for value in values:
+            if (not return_list or return_list[-1] != value) and x_index <= self.rank(value) + 1 <= y_index:
+                return_list.append(value)
+        return return_list
 
 
 if __name__ == "__main__":
@@ -12,15 +12,31 @@ space to hold the references.
 Note that while I do check the precondition in __init__ (noone else
 would), I do not check that of getitem or setitem, since that is already
 checked by self.array[index].
+
+Slices, copy_from and fill hand whole blocks to ctypes, so they run as C-level
+block moves rather than Python loops, and view() gives a window onto part of
+an array without copying it.
+
+TypedArrayR stores unboxed int64 or float64 values in a ctypes primitive array
+(zero-initialised by ctypes) and exports them through the buffer protocol.
+ctypes silently wraps integers that do not fit in 64 bits, so int64 writes are
+range checked and raise OverflowError instead.
+
+ctypes is only imported once the first array is created, so that importing
+this module (or the heaps and trees built on it) stays cheap.
 """
+from __future__ import annotations
+
 __author__ = "Julian Garcia for the __init__ code, Maria Garcia de la Banda for the rest"
 __docformat__ = 'reStructuredText'
 
-from ctypes import py_object
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, List, Sequence
 
 T = TypeVar('T')
 
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
 
 class ArrayR(Generic[T]):
     def __init__(self, length: int) -> None:
@@ -30,8 +46,9 @@ class ArrayR(Generic[T]):
         """
         if length <= 0:
             raise ValueError("Array length should be larger than 0.")
+        from ctypes import py_object
         self.array = (length * py_object)() # initialises the space
-        self.array[:] =  [None for _ in range(length)]
+        self.array[:] = [None] * length
 
     def __len__(self) -> int:
         """ Returns the length of the array
@@ -39,16 +56,177 @@ class ArrayR(Generic[T]):
         """
         return len(self.array)
 
-    def __getitem__(self, index: int) -> T:
-        """ Returns the object in position index.
-        :complexity: O(1)
+    def __getitem__(self, index: int | slice) -> T | List[T]:
+        """ Returns the object in position index, or a list copy of a slice.
+        :complexity: O(1) for an index, O(k) for a slice of k elements
         :pre: index in between 0 and length - self.array[] checks it
         """
         return self.array[index]
 
-    def __setitem__(self, index: int, value: T) -> None:
-        """ Sets the object in position index to value
-        :complexity: O(1)
+    def __setitem__(self, index: int | slice, value: T | Sequence[T]) -> None:
+        """ Sets the object in position index to value, or the elements of a
+        slice to those of an equally long sequence (list, ArrayR or ArrayView).
+        :complexity: O(1) for an index, O(k) for a slice of k elements
         :pre: index in between 0 and length - self.array[] checks it
         """
+        if isinstance(index, slice) and isinstance(value, (ArrayR, ArrayView)):
+            value = value[:]
         self.array[index] = value
+
+    def copy_from(self, other: ArrayR[T] | ArrayView[T], src: int, dst: int, n: int) -> None:
+        """ Copies the n elements of other starting at src into this array
+        starting at dst. Overlapping ranges of the same array are safe.
+        :complexity: O(n)
+        :pre: both ranges lie within their arrays
+        """
+        if src < 0 or dst < 0 or n < 0 or src + n > len(other) or dst + n > len(self):
+            raise IndexError("Copy range out of bounds.")
+        self.array[dst:dst + n] = other[src:src + n]
+
+    def fill(self, value: T, start: int = 0, stop: int | None = None) -> None:
+        """ Sets every element from start up to (not including) stop to value.
+        :complexity: O(stop - start)
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start < stop:
+            self.array[start:stop] = [value] * (stop - start)
+
+    def view(self, start: int = 0, stop: int | None = None) -> ArrayView[T]:
+        """ Returns a window onto elements start to stop - 1 that shares
+        this array's storage.
+        :complexity: O(1)
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return ArrayView(self, start, max(start, stop))
+
+
+class TypedArrayR(ArrayR[T]):
+    """ Array of unboxed int64 or float64 values, 8 bytes per element. """
+
+    DTYPES = {
+        'int64': ('c_int64', 'q'),
+        'float64': ('c_double', 'd'),
+    }
+
+    def __init__(self, length: int, dtype: str = 'int64') -> None:
+        """ Creates a zero-filled array of the given length and dtype
+        :complexity: O(length) for ctypes to clear the memory
+        :pre: length > 0 and dtype is one of DTYPES
+        """
+        if length <= 0:
+            raise ValueError("Array length should be larger than 0.")
+        if dtype not in self.DTYPES:
+            raise ValueError("Unknown dtype: {0}".format(dtype))
+        import ctypes
+        self.dtype = dtype
+        ctype, self.typecode = self.DTYPES[dtype]
+        self.array = (length * getattr(ctypes, ctype))()
+
+    def __setitem__(self, index: int | slice, value: T | Sequence[T]) -> None:
+        """ See ArrayR.__setitem__.
+        :complexity: O(1) for an index, O(k) for a slice of k elements
+        :raises OverflowError: if an int64 value is out of range
+        """
+        if self.dtype == 'int64':
+            if isinstance(index, slice):
+                from array import array
+                if isinstance(value, (ArrayR, ArrayView)):
+                    value = value[:]
+                value = array('q', value)  # range checks every value in C
+            else:
+                check_int64(value)
+        super().__setitem__(index, value)
+
+    def copy_from(self, other: ArrayR[T] | ArrayView[T], src: int, dst: int, n: int) -> None:
+        """ See ArrayR.copy_from. Between typed arrays of the same dtype this
+        is a single memmove.
+        :complexity: O(n)
+        """
+        if src < 0 or dst < 0 or n < 0 or src + n > len(other) or dst + n > len(self):
+            raise IndexError("Copy range out of bounds.")
+        if not (isinstance(other, TypedArrayR) and other.dtype == self.dtype):
+            self[dst:dst + n] = other[src:src + n]
+            return
+        from ctypes import sizeof, memmove, addressof
+        width = sizeof(self.array._type_)
+        memmove(addressof(self.array) + dst * width, addressof(other.array) + src * width, n * width)
+
+    def fill(self, value: T, start: int = 0, stop: int | None = None) -> None:
+        """ See ArrayR.fill.
+        :raises OverflowError: if an int64 value is out of range
+        """
+        if self.dtype == 'int64':
+            check_int64(value)
+        super().fill(value, start, stop)
+
+    def memoryview(self) -> memoryview:
+        """ Returns a writable memoryview over the values, e.g. for
+        numpy.frombuffer, without copying.
+        :complexity: O(1)
+        """
+        return memoryview(self.array).cast('B').cast(self.typecode)
+
+
+def check_int64(value: int) -> None:
+    """ Raises OverflowError if value does not fit in a signed 64 bit integer. """
+    if not INT64_MIN <= value <= INT64_MAX:
+        raise OverflowError("{0} does not fit in int64.".format(value))
+
+
+class ArrayView(Generic[T]):
+    """ Window onto a contiguous part of an ArrayR. Reads and writes go
+    straight to the underlying array; nothing is copied.
+    """
+
+    def __init__(self, base: ArrayR[T], start: int, stop: int) -> None:
+        """ :complexity: O(1)
+        :pre: 0 <= start <= stop <= len(base)
+        """
+        self.base = base
+        self.start = start
+        self.length = stop - start
+
+    def __len__(self) -> int:
+        """ :complexity: O(1) """
+        return self.length
+
+    def translate(self, index: int | slice) -> int | slice:
+        """ Maps an index or slice of the view onto the underlying array. """
+        if isinstance(index, slice):
+            positions = range(*index.indices(self.length))
+            if not positions:
+                return slice(0, 0)
+            # stop one step past the last position, or run to the front of the base array
+            stop = self.start + positions[-1] + positions.step
+            return slice(self.start + positions[0], stop if stop >= 0 else None, positions.step)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("View index out of range.")
+        return self.start + index
+
+    def __getitem__(self, index: int | slice) -> T | List[T]:
+        """ :complexity: O(1) for an index, O(k) for a slice of k elements """
+        return self.base[self.translate(index)]
+
+    def __setitem__(self, index: int | slice, value: T | Sequence[T]) -> None:
+        """ :complexity: O(1) for an index, O(k) for a slice of k elements """
+        self.base[self.translate(index)] = value
+
+    def copy_from(self, other: ArrayR[T] | ArrayView[T], src: int, dst: int, n: int) -> None:
+        """ See ArrayR.copy_from, with dst relative to the view. """
+        if dst < 0 or dst + n > self.length:
+            raise IndexError("Copy range out of bounds.")
+        self.base.copy_from(other, src, self.start + dst, n)
+
+    def fill(self, value: T, start: int = 0, stop: int | None = None) -> None:
+        """ See ArrayR.fill, with start and stop relative to the view. """
+        start, stop, _ = slice(start, stop).indices(self.length)
+        self.base.fill(value, self.start + start, self.start + stop)
+
+    def view(self, start: int = 0, stop: int | None = None) -> ArrayView[T]:
+        """ Returns a narrower window onto the same storage.
+        :complexity: O(1)
+        """
+        start, stop, _ = slice(start, stop).indices(self.length)
+        return ArrayView(self.base, self.start + start, self.start + max(start, stop))
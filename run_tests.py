@@ -1,9 +1,37 @@
 import argparse
+import json
+import os
 import re
 import unittest
 from io import StringIO
 
-from ed_utils.json_test_runner import JSONTestRunner
+from ed_utils.decorators import benchmark
+from ed_utils.json_test_runner import JSONTestRunner, run_parallel
+
+
+def iter_test_ids(suite):
+    for t in suite:
+        if isinstance(t, unittest.TestSuite):
+            yield from iter_test_ids(t)
+        else:
+            yield t.id()
+
+
+def print_summary(results):
+    for r in results:
+        status = "ok" if r.get("passed") else "FAIL"
+        details = "{:.3f}s".format(r.get("duration", 0))
+        if "peak_memory" in r:
+            details += ", {} KiB peak".format(r["peak_memory"] // 1024)
+        print("{} ... {} ({})".format(r["name"], status, details))
+    failed = [r for r in results if not r.get("passed")]
+    for r in failed:
+        print("=" * 70)
+        print("FAIL: {}".format(r["name"]))
+        print(r.get("feedback", ""))
+    print("-" * 70)
+    print("Ran {} tests".format(len(results)))
+    print("FAILED (failures={})".format(len(failed)) if failed else "OK")
 
 if __name__ == "__main__":
 
@@ -31,7 +59,29 @@ if __name__ == "__main__":
         help="Use if running on Ed.",
         action="store_true",
     )
+    p.add_argument(
+        "-b",
+        "--bench",
+        help="Run only the @benchmark tests (skipped otherwise).",
+        action="store_true",
+    )
+    p.add_argument(
+        "-m",
+        "--memory",
+        help="Record the peak traced memory of every test (slows the tests down).",
+        action="store_true",
+    )
+    p.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of processes to shard the tests across.",
+        type=int,
+        default=1,
+    )
     args = p.parse_args()
+    if args.bench:
+        # lets the @benchmark tests run, here and in the -j worker processes
+        os.environ[benchmark.ENV_VAR] = "1"
 
     suite = unittest.defaultTestLoader.discover('.')
     for s in suite:
@@ -43,13 +93,23 @@ if __name__ == "__main__":
                 func = getattr(t2, t2._testMethodName)
                 if getattr(func, "__advanced__", None) is True and not args.advanced:
                     marked_remove.add(t2)
+                elif (getattr(func, "__benchmark__", None) is not None) != args.bench:
+                    marked_remove.add(t2)
                 elif args.task and not re.match(rf"^{args.task}\.", getattr(func, "__number__", "")):
                     marked_remove.add(t2)
             for t2 in marked_remove:
                 t._tests.remove(t2)
-    if args.for_ed:
+    # tracemalloc would distort the timings of benchmarks
+    track_memory = args.memory and not args.bench
+    if args.jobs > 1:
+        results = run_parallel(list(iter_test_ids(suite)), args.jobs, track_memory=track_memory)
+        if args.for_ed:
+            print(json.dumps({"testcases": results}, indent=4))
+        else:
+            print_summary(results)
+    elif args.for_ed:
         f = StringIO("")
-        runner = JSONTestRunner(stream=f)
+        runner = JSONTestRunner(stream=f, track_memory=track_memory)
         runner.run(suite)
 
         print(f.getvalue())
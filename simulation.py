@@ -0,0 +1,145 @@
+""" Discrete-event harvest simulation driven by BeehiveSelector.
+    Events wait in a priority queue ordered by time, and the clock jumps straight
+    from one event time to the next, so a run costs time in proportion to its
+    number of events rather than to its length in ticks.
+    All the events due at the same time are handled as one batch: changes to the
+    beehives are applied first, with at most one rebuild of the heap, and then
+    every harvester due at that time harvests in one harvest_many call.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from heapq import heappush, heappop
+from itertools import count
+from typing import Callable, List
+
+from beehive import Beehive, BeehiveSelector
+
+HARVEST = 'harvest'
+REFILL = 'refill'
+ADD = 'add'
+REMOVE = 'remove'
+EVENT_KINDS = (HARVEST, REFILL, ADD, REMOVE)
+
+
+@dataclass(order=True)
+class Event:
+    """
+    A scheduled event; events at the same time are handled in the order they
+    were scheduled. The payload depends on the kind:
+    HARVEST: the number of harvesters,
+    REFILL: (hive, amount), where hive None refills every beehive,
+    ADD and REMOVE: the beehive.
+    A recurring event is scheduled again every `every` time units.
+    """
+
+    time: float
+    seq: int
+    kind: str = field(compare=False)
+    payload: object = field(compare=False)
+    every: float | None = field(default=None, compare=False)
+
+
+class HarvestSimulation:
+
+    def __init__(self, selector: BeehiveSelector | None = None,
+                 on_harvest: Callable[[float, List[int]], None] | None = None):
+        """
+        selector makes the harvesting decisions (a new, empty one by default).
+        on_harvest, if given, is called with the time and the harvested values
+        of every batch of harvests.
+        """
+        self.selector = BeehiveSelector(0) if selector is None else selector
+        self.on_harvest = on_harvest
+        self.events = []
+        self.sequence = count()
+        self.now = 0
+        self.harvested = 0
+        self.handled = 0
+
+    def schedule(self, time: float, kind: str, payload=None, every: float | None = None) -> Event:
+        """
+        Schedules an event, see Event for the payload of each kind.
+        Complexity: O(log E) where E is the number of pending events
+        """
+        if kind not in EVENT_KINDS:
+            raise ValueError("Unknown event kind: {0}".format(kind))
+        if time < self.now:
+            raise ValueError("Cannot schedule an event in the past.")
+        if every is not None and every <= 0:
+            raise ValueError("every should be positive.")
+        event = Event(time, next(self.sequence), kind, payload, every)
+        heappush(self.events, event)
+        return event
+
+    def harvest(self, time: float, harvesters: int = 1, every: float | None = None) -> Event:
+        return self.schedule(time, HARVEST, harvesters, every)
+
+    def refill(self, time: float, amount: int, hive: Beehive | None = None,
+               every: float | None = None) -> Event:
+        return self.schedule(time, REFILL, (hive, amount), every)
+
+    def add_beehive(self, time: float, hive: Beehive) -> Event:
+        return self.schedule(time, ADD, hive)
+
+    def remove_beehive(self, time: float, hive: Beehive) -> Event:
+        return self.schedule(time, REMOVE, hive)
+
+    def run(self, until: float = float('inf')) -> int:
+        """
+        Handles every event due up to and including time until, and returns the
+        total value harvested meanwhile. A run that stops at until can be resumed.
+        Complexity: O(B (M + H log M) + E log E) over E events falling at B distinct
+        times, for H harvesters per batch and M beehives; batches that only
+        harvest or add beehives skip the O(M) rebuild.
+        """
+        harvested = self.harvested
+        while self.events and self.events[0].time <= until:
+            self.step()
+        if until != float('inf'):
+            self.now = max(self.now, until)
+        return self.harvested - harvested
+
+    def step(self) -> List[int]:
+        """
+        Handles the batch of events due at the next event time, and returns the
+        values harvested by it.
+        """
+        time = self.events[0].time
+        self.now = time
+        added, removed, harvesters, changed = [], set(), 0, False
+        while self.events and self.events[0].time == time:
+            event = heappop(self.events)
+            self.handled += 1
+            if event.kind == HARVEST:
+                harvesters += event.payload
+            elif event.kind == REFILL:
+                hive, amount = event.payload
+                refilled = [hive] if hive is not None else self.selector.beehives() + added
+                for hive in refilled:
+                    hive.volume += amount
+                changed = True
+            elif event.kind == ADD:
+                added.append(event.payload)
+            else:
+                removed.add(id(event.payload))
+            if event.every is not None:
+                heappush(self.events, Event(time + event.every, next(self.sequence),
+                                            event.kind, event.payload, event.every))
+
+        heap = self.selector.our_adt
+        fits = len(heap) + len(added) < len(heap.the_array)
+        if changed or removed or not fits:
+            # refills can raise any hive above its parent: rebuild once for the whole batch,
+            # leaving room for as many adds again
+            hives = [hive for hive in self.selector.beehives() + added if id(hive) not in removed]
+            self.selector.set_all_beehives(hives, 2 * len(hives))
+        else:
+            for hive in added:
+                self.selector.add_beehive(hive)
+
+        values = self.selector.harvest_many(harvesters) if harvesters and len(self.selector) else []
+        self.harvested += sum(values)
+        if values and self.on_harvest is not None:
+            self.on_harvest(time, values)
+        return values
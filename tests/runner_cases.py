@@ -0,0 +1,30 @@
+""" Sample tests run by tests/test_json_test_runner.py; not collected on their own. """
+import time
+import unittest
+from ed_utils.decorators import number, benchmark
+
+
+class RunnerCases(unittest.TestCase):
+
+    @number("0.1")
+    def test_sleep(self):
+        time.sleep(0.05)
+
+    @number("0.2")
+    def test_allocate(self):
+        block = bytearray(4 * 1024 * 1024)
+        del block
+
+    @number("0.3")
+    def test_fail(self):
+        print("some output")
+        self.fail("expected failure")
+
+    @number("0.4")
+    def test_pass(self):
+        pass
+
+    @number("0.5")
+    @benchmark(sizes=[10, 100], repeat=1)
+    def test_benchmark(self, n):
+        return lambda: sum(range(n))
@@ -1,8 +1,9 @@
+import random
 import unittest
-from ed_utils.decorators import number, visibility
+from ed_utils.decorators import number, visibility, benchmark
 from ed_utils.timeout import timeout
 
-from beehive import BeehiveSelector, Beehive
+from beehive import BeehiveSelector, Beehive, top_k_beehives
 
 
 class TestBeehiveSelector(unittest.TestCase):
@@ -48,3 +49,96 @@ class TestBeehiveSelector(unittest.TestCase):
         for actual, ex in zip(all_emeralds, expected):
             self.assertAlmostEqual(actual, ex, 0)
 
+    @timeout()
+    @number("5.2")
+    def test_meld_and_top_k(self):
+        random.seed(90218374)
+        hives = [
+            Beehive(i, i, i, capacity=random.randint(1, 50), nutrient_factor=random.randint(1, 20),
+                    volume=random.randint(0, 50))
+            for i in range(60)
+        ]
+        shards = [BeehiveSelector(30), BeehiveSelector(20), BeehiveSelector(10)]
+        shards[0].set_all_beehives(hives[:30])
+        shards[1].set_all_beehives(hives[30:50])
+        shards[2].set_all_beehives(hives[50:])
+
+        def value(hive):
+            return min(hive.capacity, hive.volume) * hive.nutrient_factor
+
+        best = [value(h) for h in top_k_beehives(shards, 8)]
+        self.assertEqual(best, sorted(map(value, hives), reverse=True)[:8])
+        self.assertEqual([len(s.our_adt) for s in shards], [30, 20, 10])
+
+        merged = BeehiveSelector(1)
+        for shard in shards:
+            merged.meld(shard)
+        self.assertEqual(len(merged.our_adt), 60)
+        # the beehives moved to merged, the shards are left empty
+        self.assertEqual([len(s.our_adt) for s in shards], [0, 0, 0])
+        self.assertRaises(ValueError, merged.meld, merged)
+        drained = [merged.our_adt.get_max() for _ in range(60)]
+        self.assertEqual(list(map(value, drained)), sorted(map(value, hives), reverse=True))
+
+    @timeout()
+    @number("5.3")
+    def test_peek(self):
+        s = BeehiveSelector(5)
+        self.assertRaises(IndexError, s.peek_best_beehive)
+        self.assertEqual(s.top_k(3), [])
+        hives = [
+            Beehive(15, 12, 13, capacity=40, nutrient_factor=5, volume=15),
+            Beehive(25, 22, 23, capacity=15, nutrient_factor=9, volume=40),
+            Beehive(35, 32, 33, capacity=40, nutrient_factor=3, volume=40),
+            Beehive(45, 42, 43, capacity=1, nutrient_factor=85, volume=10),
+            Beehive(55, 52, 53, capacity=400, nutrient_factor=5000, volume=0),
+        ]
+        for hive in hives:
+            s.add_beehive(hive)
+        before = s.our_adt.the_array[:]
+
+        self.assertIs(s.peek_best_beehive(), hives[1])
+        self.assertEqual(s.top_k(3), [hives[1], hives[2], hives[3]])
+        self.assertEqual(s.top_k(10), [hives[1], hives[2], hives[3], hives[0], hives[4]])
+        self.assertEqual(s.our_adt.the_array[:], before)
+        self.assertEqual(s.harvest_best_beehive(), 135)
+
+    @timeout()
+    @number("5.4")
+    @benchmark(sizes=[1000, 4000, 16000, 64000], repeat=5, bound="log n")
+    def test_harvest_scaling(self, n):
+        random.seed(n)
+        # volumes under twice the capacity: every harvest lowers the value of the
+        # hive, so it sinks, and a hive is drained by its second harvest
+        hives = []
+        for i in range(n):
+            capacity = random.randint(1, 50)
+            hives.append(Beehive(i, i, i, capacity=capacity, nutrient_factor=random.randint(1, 20),
+                                 volume=capacity + random.randint(0, capacity - 1)))
+        volumes = [hive.volume for hive in hives]
+        s = BeehiveSelector(n)
+        s.set_all_beehives(hives)
+
+        def harvest():
+            if s.peek_best_beehive().volume == 0:
+                # every hive is drained: refill them all, O(1) amortised over 2n harvests
+                for hive, volume in zip(hives, volumes):
+                    hive.volume = volume
+                s.set_all_beehives(hives)
+            return s.harvest_best_beehive()
+        return harvest
+
+    @timeout()
+    @number("5.5")
+    def test_harvest_shard_after_meld(self):
+        shard = BeehiveSelector(2)
+        shard.add_beehive(Beehive(0, 0, 0, capacity=30, nutrient_factor=1, volume=30))
+        shard.add_beehive(Beehive(1, 1, 1, capacity=40, nutrient_factor=1, volume=40))
+        merged = BeehiveSelector(1)
+        merged.meld(shard)
+        self.assertEqual(merged.harvest_best_beehive(), 40)
+        # the shard gave its beehives away, so it cannot hand out the harvested one again
+        self.assertRaises(IndexError, shard.harvest_best_beehive)
+        shard.add_beehive(Beehive(2, 2, 2, capacity=20, nutrient_factor=1, volume=20))
+        self.assertEqual(shard.harvest_best_beehive(), 20)
+        self.assertEqual(merged.harvest_best_beehive(), 30)
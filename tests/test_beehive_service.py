@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from beehive import BeehiveSelector, Beehive
+from beehive_service import LockedBeehiveSelector, AsyncBeehiveSelector
+
+
+def make_hives():
+    return [
+        Beehive(i, i, i, capacity=3, nutrient_factor=i + 1, volume=30)
+        for i in range(10)
+    ]
+
+
+class BeehiveServiceTest(unittest.TestCase):
+
+    @timeout()
+    @number("10.1")
+    def test_threads(self):
+        s = LockedBeehiveSelector(BeehiveSelector(10))
+        s.set_all_beehives(make_hives())
+        serial = BeehiveSelector(10)
+        serial.set_all_beehives(make_hives())
+        expected = serial.harvest_many(80)
+
+        harvested = []
+
+        def worker():
+            for _ in range(20):
+                harvested.append(s.harvest_best_beehive())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(harvested), sorted(expected))
+        self.assertEqual(sum(h.volume for h in s.top_k(10)), 10 * 30 - 80 * 3)
+
+    @timeout()
+    @number("10.2")
+    def test_async(self):
+        serial = BeehiveSelector(10)
+        serial.set_all_beehives(make_hives())
+        expected = serial.harvest_many(50)
+
+        selector = BeehiveSelector(10)
+        selector.set_all_beehives(make_hives())
+        service = AsyncBeehiveSelector(selector, window=0.01)
+        batches = []
+        harvest_many = service.locked.harvest_many
+
+        def counting(n):
+            batches.append(n)
+            return harvest_many(n)
+
+        service.locked.harvest_many = counting
+
+        async def main():
+            return await asyncio.gather(*(service.harvest_best_beehive() for _ in range(50)))
+
+        self.assertEqual(asyncio.run(main()), expected)
+        self.assertEqual(batches, [50])
+
+    @timeout()
+    @number("10.3")
+    def test_async_does_not_block_loop(self):
+        service = AsyncBeehiveSelector(BeehiveSelector(10), window=0.001)
+        # a thread holds the lock, e.g. through a long set_all_beehives
+        service.locked.lock.acquire()
+        threading.Timer(0.2, service.locked.lock.release).start()
+
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.ensure_future(ticker())
+            start = time.perf_counter()
+            await service.add_beehive(Beehive(99, 0, 0, capacity=5, nutrient_factor=100, volume=5))
+            value = await service.harvest_best_beehive()
+            task.cancel()
+            return value, ticks, time.perf_counter() - start
+
+        value, ticks, elapsed = asyncio.run(main())
+        self.assertEqual(value, 500)
+        self.assertGreaterEqual(elapsed, 0.15)
+        # the loop kept running other coroutines while the lock was held
+        self.assertGreater(ticks, 5)
@@ -0,0 +1,73 @@
+import time
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from benchmarks.cases import CASES, keys_in_order
+from benchmarks.startup import DEFERRED, import_profile, eager_imports
+from benchmarks.suite import run_suite, compare, estimate, OK, SKIPPED
+
+
+class BenchmarksTest(unittest.TestCase):
+
+    @timeout()
+    @number("11.1")
+    def test_run_suite(self):
+        run = run_suite(["bst.insert", "3dbt.insert+make_ordering"], sizes=[20, 10], repeat=1, budget=0)
+        results = {(r["case"], r["order"], r["n"]): r for r in run["results"]}
+        self.assertEqual(len(results), 12)
+        for order in ("random", "sorted", "adversarial"):
+            self.assertEqual(results["bst.insert", order, 10]["status"], OK)
+            self.assertEqual(results["bst.insert", order, 10]["ops"], 10)
+            # over the zero budget, so the larger size is not run
+            self.assertEqual(results["bst.insert", order, 20]["status"], SKIPPED)
+            # make_ordering is not implemented yet
+            self.assertEqual(results["3dbt.insert+make_ordering", order, 10]["status"], SKIPPED)
+        self.assertEqual(keys_in_order(5, "adversarial", None), [0, 4, 1, 3, 2])
+
+    @timeout()
+    @number("11.2")
+    def test_compare(self):
+        def result(case, per_op, status=OK):
+            return {"case": case, "order": "random", "n": 10, "status": status,
+                    "ops": 10, "seconds": per_op * 10, "per_op": per_op}
+
+        old = {"results": [result("a", 1.0), result("b", 1.0), result("c", 1.0), result("d", 1.0)]}
+        new = {"results": [result("a", 1.05), result("b", 1.5), result("c", 0.5),
+                           result("d", 0, status="error"), result("e", 1.0)]}
+        verdicts = {row["case"]: row["verdict"] for row in compare(old, new, threshold=0.1)}
+        self.assertEqual(verdicts, {"a": "ok", "b": "regression", "c": "improvement",
+                                    "d": "regression", "e": "new"})
+        verdicts = {row["case"]: row["verdict"] for row in compare(old, new, threshold=0.1, noise=100)}
+        self.assertEqual(verdicts["b"], "ok")
+
+    @timeout()
+    @number("11.3")
+    def test_deferred_imports(self):
+        for module in DEFERRED:
+            profile = import_profile(module)
+            self.assertIn(module, profile)
+            self.assertEqual(eager_imports(module, profile), [], module)
+
+    @timeout()
+    @number("11.4")
+    def test_budget_estimate(self):
+        def quadratic(n, order, rng):
+            return (lambda: time.sleep(n * n * 1e-7)), n
+
+        CASES["quadratic"] = quadratic
+        try:
+            start = time.perf_counter()
+            run = run_suite(["quadratic"], orders=["random"], sizes=[100, 300, 1000, 3000], repeat=1, budget=0.5)
+            elapsed = time.perf_counter() - start
+        finally:
+            del CASES["quadratic"]
+        statuses = [r["status"] for r in run["results"]]
+        # n=1000 sleeps 0.1s, so n=3000 would sleep 0.9s: it is never started
+        self.assertEqual(statuses, [OK, OK, OK, SKIPPED])
+        self.assertIn("estimated", run["results"][3]["reason"])
+        self.assertLess(elapsed, 0.5)
+        self.assertAlmostEqual(estimate([(10, 1.0, 1.5), (20, 4.0, 5.0)], 40), 20.0)
+        self.assertAlmostEqual(estimate([(10, 1.0, 1.5)], 30), 13.5)
+        # noisy small sizes never extrapolate below linear growth
+        self.assertAlmostEqual(estimate([(10, 2.0, 2.0), (20, 1.0, 1.0)], 40), 2.0)
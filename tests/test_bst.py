@@ -1,8 +1,18 @@
+import itertools
+import random
 import unittest
-from ed_utils.decorators import number, visibility
+from ed_utils.decorators import number, visibility, benchmark
 from ed_utils.timeout import timeout
 
-from bst import BinarySearchTree
+from bst import BinarySearchTree, PersistentBinarySearchTree
+
+
+def subtree_keys(node):
+    if node is not None:
+        yield from subtree_keys(node.left)
+        yield node.key
+        yield from subtree_keys(node.right)
+
 
 class BSTTest(unittest.TestCase):
 
@@ -77,3 +87,221 @@ class BSTTest(unittest.TestCase):
         kth = BST.kth_smallest(5, BST.root)
         self.assertEqual(kth.key, 95)
         self.assertEqual(kth.item, 1)
+
+    @timeout()
+    @number("1.4")
+    def test_order_statistics(self):
+        BST = BinarySearchTree()
+        for i, key in enumerate([95, 73, 99, 50, 85, 80]):
+            BST[key] = i
+
+        self.assertEqual([BST.select(k) for k in range(1, 7)], [50, 73, 80, 85, 95, 99])
+        self.assertRaises(IndexError, BST.select, 7)
+        self.assertEqual(BST.select_range(2, 4), [73, 80, 85])
+        self.assertEqual(BST.select_range(5, 10), [95, 99])
+
+        self.assertEqual(BST.rank(50), 0)
+        self.assertEqual(BST.rank(85), 3)
+        self.assertEqual(BST.rank(86), 4)
+        self.assertEqual(BST.rank(100), 6)
+
+        self.assertEqual(BST.floor(84), 80)
+        self.assertEqual(BST.floor(85), 85)
+        self.assertRaises(KeyError, BST.floor, 49)
+        self.assertEqual(BST.ceiling(81), 85)
+        self.assertEqual(BST.ceiling(99), 99)
+        self.assertRaises(KeyError, BST.ceiling, 100)
+
+        self.assertEqual(BST.count_range(73, 95), 4)
+        self.assertEqual(BST.count_range(74, 84), 1)
+        self.assertEqual(BST.count_range(96, 90), 0)
+
+    @timeout()
+    @number("1.5")
+    def test_split_join_merge(self):
+        random.seed(1209381)
+        keys = random.sample(range(1000), 200)
+        BST = BinarySearchTree()
+        for key in keys:
+            BST[key] = str(key)
+
+        left, right = BST.split(500)
+        self.assertEqual(len(BST), 0)
+        self.assertEqual([n.key for n in left.iter_nodes()], sorted(k for k in keys if k < 500))
+        self.assertEqual([n.key for n in right.iter_nodes()], sorted(k for k in keys if k >= 500))
+        for tree in (left, right):
+            for node in tree.iter_nodes():
+                self.assertEqual(node.subtree_size, sum(1 for _ in subtree_keys(node)))
+
+        joined = BinarySearchTree.join(left, right)
+        self.assertEqual(len(joined), 200)
+        self.assertEqual([joined.select(k) for k in range(1, 201)], sorted(keys))
+        self.assertEqual(joined[keys[0]], str(keys[0]))
+
+        other = BinarySearchTree.from_sorted((k, k) for k in range(1001, 1051, 2))
+        self.assertRaises(ValueError, BinarySearchTree.join, other, BinarySearchTree.from_sorted([(0, 0)]))
+        evens = BinarySearchTree.from_sorted((k, k) for k in range(1000, 1050, 2))
+        merged = BinarySearchTree.merge(joined, BinarySearchTree.merge(evens, other))
+        self.assertEqual(len(merged), 250)
+        self.assertEqual(merged.select_range(1, 250), sorted(keys) + list(range(1000, 1050)))
+        self.assertEqual(merged.root.subtree_size, 250)
+
+        # disjoint ranges are joined, still under the policy of the first tree
+        high = BinarySearchTree.from_sorted([(5000, 0)], duplicates="count")
+        merged = BinarySearchTree.merge(high, merged)
+        self.assertEqual(merged.duplicates, "count")
+        merged[5000] = 1
+        self.assertEqual(len(merged), 252)
+
+    @timeout()
+    @number("1.6")
+    def test_persistent_snapshots(self):
+        BST = PersistentBinarySearchTree()
+        for i, key in enumerate([95, 73, 99, 50, 85, 80]):
+            BST[key] = i
+        before = BST.snapshot()
+
+        BST[60] = 6
+        del BST[73]
+        del BST[95]
+        left, right = BST.split(82)
+
+        self.assertEqual(len(before), 6)
+        self.assertEqual(before.select_range(1, 6), [50, 73, 80, 85, 95, 99])
+        self.assertEqual(before.root.subtree_size, 6)
+        self.assertEqual(before[95], 0)
+        self.assertEqual(left.select_range(1, 3), [50, 60, 80])
+        self.assertEqual(right.select_range(1, 2), [85, 99])
+        self.assertRaises(TypeError, before.__setitem__, 1, 1)
+        self.assertRaises(TypeError, before.__delitem__, 50)
+        # join and merge would empty their inputs
+        other = PersistentBinarySearchTree()
+        other[1000] = 7
+        for combine in (PersistentBinarySearchTree.merge, PersistentBinarySearchTree.join):
+            self.assertRaises(TypeError, combine, before, other)
+            self.assertRaises(TypeError, combine, other, before)
+        self.assertEqual(len(before), 6)
+        self.assertEqual(before.select_range(1, 6), [50, 73, 80, 85, 95, 99])
+        self.assertEqual(len(other), 1)
+
+        # a join or merge result reuses persistent nodes, so it copies on write too
+        for combine, other_keys in ((BinarySearchTree.join, [20]), (BinarySearchTree.merge, [4, 20])):
+            a, b = PersistentBinarySearchTree("list"), PersistentBinarySearchTree("list")
+            for key in (5, 3, 8):
+                a[key] = key
+            for key in other_keys:
+                b[key] = key
+            snapshot = a.snapshot()
+            joined = combine(a, b)
+            self.assertIsInstance(joined, PersistentBinarySearchTree)
+            joined[9] = 9
+            joined[5] = 6
+            self.assertEqual([(node.key, node.item) for node in snapshot.iter_nodes()],
+                             [(3, [3]), (5, [5]), (8, [8])])
+            self.assertEqual(len(snapshot), 3)
+            self.assertEqual(joined.select_range(1, len(joined)), sorted([3, 5, 5, 8, 9] + other_keys))
+
+    @timeout()
+    @number("1.7")
+    def test_duplicates(self):
+        self.assertRaises(ValueError, BinarySearchTree, "bogus")
+
+        BST = BinarySearchTree()
+        BST[5] = 1
+        self.assertRaises(ValueError, BST.__setitem__, 5, 2)
+        self.assertEqual(BST.root.subtree_size, 1)
+
+        BST = BinarySearchTree("replace")
+        BST[5] = 1
+        BST[5] = 2
+        self.assertEqual((len(BST), BST[5], BST.root.subtree_size), (1, 2, 1))
+
+        random.seed(230498)
+        keys = [random.randint(0, 20) for _ in range(300)]
+        BST = BinarySearchTree("count")
+        for key in keys:
+            BST[key] = key
+        self.assertEqual(len(BST), 300)
+        self.assertEqual(BST.root.subtree_size, 300)
+        self.assertEqual(BST.select_range(1, 300), sorted(keys))
+        self.assertEqual([BST.kth_smallest(k, BST.root).key for k in range(1, 301)], sorted(keys))
+        self.assertEqual(BST.select_range(17, 40), sorted(keys)[16:40])
+        self.assertEqual(BST.rank(10), sum(k < 10 for k in keys))
+        self.assertEqual(BST.count_range(5, 7), sum(5 <= k <= 7 for k in keys))
+        for key in keys[:250]:
+            del BST[key]
+        self.assertEqual(BST.select_range(1, 50), sorted(keys[250:]))
+        self.assertEqual(BST.root.subtree_size, 50)
+
+        BST = BinarySearchTree("list")
+        for item, key in enumerate([3, 1, 3, 2, 3]):
+            BST[key] = item
+        self.assertEqual(BST[3], [0, 2, 4])
+        del BST[3]
+        self.assertEqual(BST[3], [2, 4])
+        self.assertEqual(BST.select_range(1, 4), [1, 2, 3, 3])
+
+    @timeout()
+    @number("1.8")
+    def test_cursor(self):
+        BST = BinarySearchTree()
+        keys = [95, 73, 99, 50, 85, 80]
+        for i, key in enumerate(keys):
+            BST[key] = i
+
+        cursor = BST.seek(74)
+        self.assertEqual(cursor.peek().key, 80)
+        self.assertEqual(cursor.next().key, 85)
+        self.assertEqual(cursor.next().key, 95)
+        self.assertEqual(cursor.prev().key, 85)
+        self.assertEqual(cursor.next().key, 95)
+        self.assertEqual(cursor.next().key, 99)
+        self.assertIsNone(cursor.next())
+        self.assertIsNone(cursor.next())
+        self.assertEqual(cursor.prev().key, 99)
+
+        cursor = BST.seek_rank(1)
+        walked = [cursor.peek().key]
+        while cursor.next() is not None:
+            walked.append(cursor.peek().key)
+        self.assertEqual(walked, sorted(keys))
+        self.assertIsNone(BST.seek(100).peek())
+        self.assertEqual(BST.seek(100).prev().key, 99)
+        self.assertEqual(BST.seek(73).peek().item, 1)
+        self.assertRaises(IndexError, BST.seek_rank, 7)
+
+        cursor = BST.seek(73)
+        cursor.delete_current()
+        self.assertEqual(cursor.peek().key, 80)
+        cursor.delete_current()
+        self.assertEqual(cursor.peek().key, 85)
+        self.assertEqual(cursor.prev().key, 50)
+        self.assertIsNone(cursor.prev())
+        self.assertEqual(cursor.next().key, 50)
+        self.assertEqual(BST.select_range(1, 4), [50, 85, 95, 99])
+        self.assertEqual(BST.root.subtree_size, 4)
+
+    @timeout()
+    @number("1.10")
+    def test_select_many(self):
+        random.seed(5521)
+        tree = BinarySearchTree(duplicates="count")
+        keys = [random.randint(0, 40) for _ in range(200)]
+        for key in keys:
+            tree[key] = key
+        keys.sort()
+        ranks = sorted(random.sample(range(1, 201), 30) + [1, 1, 200])
+        self.assertEqual(tree.select_many(ranks), [keys[k - 1] for k in ranks])
+        self.assertEqual(tree.select_many([]), [])
+        with self.assertRaises(IndexError):
+            tree.select_many([0, 5])
+        with self.assertRaises(IndexError):
+            tree.select_many([5, 201])
+
+    @timeout()
+    @number("1.9")
+    @benchmark(sizes=[1000, 4000, 16000, 64000], repeat=5, bound="log n")
+    def test_kth_smallest_scaling(self, n):
+        BST = BinarySearchTree.from_sorted((k, k) for k in range(n))
+        ranks = itertools.cycle(random.sample(range(1, n + 1), 256))
+        return lambda: BST.kth_smallest(next(ranks), BST.root)
@@ -0,0 +1,63 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from btree import BTree
+from bst import BinarySearchTree
+
+
+class BTreeTest(unittest.TestCase):
+
+    @timeout()
+    @number("8.1")
+    def test_mapping(self):
+        tree = BTree(fanout=4)
+        keys = [95, 73, 99, 50, 85, 80, 12, 40, 61, 77, 3]
+        for i, key in enumerate(keys):
+            tree[key] = i
+        self.assertEqual(len(tree), 11)
+        self.assertFalse(tree.root.is_leaf())
+        for i, key in enumerate(keys):
+            self.assertEqual(tree[key], i)
+        self.assertNotIn(74, tree)
+        self.assertRaises(ValueError, tree.__setitem__, 95, 0)
+
+        for key in keys[:6]:
+            del tree[key]
+        self.assertEqual(len(tree), 5)
+        self.assertRaises(KeyError, tree.__getitem__, 95)
+        self.assertRaises(ValueError, tree.__delitem__, 95)
+        self.assertEqual(tree.select_range(1, 5), [3, 12, 40, 61, 77])
+
+        kth = tree.kth_smallest(3)
+        self.assertEqual((kth.key, kth.item), (40, 7))
+        self.assertRaises(IndexError, tree.kth_smallest, 6)
+
+    @timeout()
+    @number("8.2")
+    def test_order_statistics(self):
+        random.seed(4092381)
+        tree = BTree("count", fanout=8)
+        reference = BinarySearchTree("count")
+        for _ in range(3000):
+            key = random.randint(0, 300)
+            if len(reference) and random.random() < 0.3:
+                key = reference.select(random.randint(1, len(reference)))
+                del tree[key]
+                del reference[key]
+            else:
+                tree[key] = key
+                reference[key] = key
+
+        n = len(reference)
+        self.assertEqual(len(tree), n)
+        self.assertEqual(tree.root.size, n)
+        self.assertEqual(tree.select_range(1, n), reference.select_range(1, n))
+        for k in random.sample(range(1, n + 1), 50):
+            self.assertEqual(tree.select(k), reference.select(k))
+            self.assertEqual(tree.select_range(k, k + 20), reference.select_range(k, k + 20))
+        for key in range(-1, 302, 7):
+            self.assertEqual(tree.rank(key), reference.rank(key))
+            self.assertEqual(tree.count_range(key, key + 30), reference.count_range(key, key + 30))
+        self.assertRaises(IndexError, tree.select, n + 1)
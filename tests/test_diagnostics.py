@@ -0,0 +1,61 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from bst import BinarySearchTree
+from diagnostics import shape_report, sample_shape, check_shape, optimal_average_depth
+from threedeebeetree import ThreeDeeBeeTree
+from tests.test_balancing import collect_worst_ratio
+
+
+class DiagnosticsTest(unittest.TestCase):
+
+    @timeout()
+    @number("13.1")
+    def test_bst_report(self):
+        tree = BinarySearchTree()
+        for key in [4, 2, 6, 1, 3, 5, 7]:
+            tree[key] = key
+        report = shape_report(tree)
+        self.assertEqual(report.size, 7)
+        self.assertEqual(report.height, 2)
+        self.assertEqual(report.depth_histogram, [1, 2, 4])
+        self.assertAlmostEqual(report.average_depth, 10 / 7)
+        self.assertAlmostEqual(report.optimal_average_depth, 10 / 7)
+        self.assertFalse(report.needs_rebuild())
+
+        chain = BinarySearchTree()
+        for key in range(40):
+            chain[key] = key
+        alerts = []
+        report = check_shape(chain, alerts.append)
+        self.assertEqual(alerts, [report])
+        self.assertEqual(report.height, 39)
+        self.assertEqual(report.worst_ratio, float('inf'))
+        self.assertEqual((report.worst_key, report.worst_axis, report.worst_sides), (0, 'key', (39, 0)))
+        self.assertEqual(optimal_average_depth(1, 8), 0)
+        self.assertEqual(optimal_average_depth(9, 8), 8 / 9)
+
+    @timeout()
+    @number("13.2")
+    def test_threedeebeetree_report(self):
+        random.seed(10239123)
+        coords = list(range(10000))
+        random.shuffle(coords)
+        tree = ThreeDeeBeeTree()
+        for i in range(3000):
+            tree[(coords[3 * i], coords[3 * i + 1], coords[3 * i + 2])] = i
+        report = shape_report(tree)
+        self.assertEqual(report.size, 3000)
+        self.assertEqual(sum(report.depth_histogram), 3000)
+        ratio, smaller, axis = collect_worst_ratio(tree.root)
+        self.assertEqual(report.worst_ratio, ratio)
+        self.assertIn(report.worst_axis, "xyz")
+
+        estimate = sample_shape(tree, 2000, seed=1)
+        self.assertTrue(estimate.sampled)
+        self.assertLessEqual(estimate.height, report.height)
+        self.assertLessEqual(estimate.worst_ratio, report.worst_ratio)
+        self.assertAlmostEqual(estimate.average_depth, report.average_depth, delta=0.5)
+        self.assertEqual(sample_shape(ThreeDeeBeeTree()).size, 0)
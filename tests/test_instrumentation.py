@@ -0,0 +1,86 @@
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from beehive import Beehive
+from bst import BinarySearchTree, PersistentBinarySearchTree
+from heap import MaxHeap
+from instrumentation import instrument, Stats
+from threedeebeetree import ThreeDeeBeeTree
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    @timeout()
+    @number("12.1")
+    def test_bst(self):
+        tree = BinarySearchTree()
+        with instrument(tree) as stats:
+            for key in [5, 3, 8, 1, 4]:
+                tree[key] = key
+            self.assertEqual(stats.operations, 5)
+            self.assertEqual(stats.node_visits, 0 + 1 + 1 + 2 + 2)
+            self.assertEqual(stats.max_depth, 2)
+            # every visited node is compared with < and then, going right, with >
+            self.assertEqual(stats.comparisons, 8)
+            stats.reset()
+            self.assertEqual(tree[4], 4)
+            self.assertEqual(stats.snapshot()["average_depth"], 3)
+            # ==, < and == at the root and 3, then == at 4
+            self.assertEqual(stats.comparisons, 5)
+            with self.assertRaises(RuntimeError):
+                with instrument(tree):
+                    pass
+        # the keys stored in the tree are never wrapped
+        self.assertEqual(type(tree.root.left.right.key), int)
+        # leaving the block restores the class methods
+        self.assertEqual(vars(tree).keys(), {"root", "length", "duplicates"})
+        tree[2] = 2
+        self.assertEqual(stats.operations, 1)
+
+        persistent = PersistentBinarySearchTree()
+        with instrument(persistent, Stats()) as stats:
+            for key in range(10):
+                persistent[key] = key
+            del persistent[0]
+        self.assertEqual(stats.max_depth, 9)
+        self.assertEqual(stats.operations, 11)
+
+    @timeout()
+    @number("12.2")
+    def test_threedeebeetree(self):
+        tree = ThreeDeeBeeTree()
+        with instrument(tree) as stats:
+            for point in [(5, 5, 5), (1, 1, 1), (7, 7, 7), (6, 6, 6)]:
+                tree[point] = point
+            self.assertEqual(stats.total_depth, 0 + 1 + 1 + 2)
+            with self.assertRaises(KeyError):
+                tree[(6, 6, 7)]
+        self.assertEqual(stats.max_depth, 3)
+        self.assertEqual(type(tree.root.oct1.oct8.key), tuple)
+        self.assertGreater(stats.comparisons, 0)
+
+    @timeout()
+    @number("12.3")
+    def test_heap(self):
+        heap = MaxHeap(8)
+        array = heap.the_array
+        with instrument(heap) as stats:
+            for value in range(1, 8):
+                heap.add(Beehive(0, 0, 0, value, 1, value))
+            # every new value is the largest, so it rises to the root
+            self.assertEqual(stats.sift_steps, 0 + 1 + 1 + 2 + 2 + 2 + 2)
+            self.assertEqual(stats.max_depth, 2)
+            stats.reset()
+            heap.get_max()
+            self.assertEqual(stats.operations, 1)
+            self.assertEqual(stats.sift_steps, 1)
+            other = MaxHeap(7)
+            for value in range(1, 8):
+                other.add(Beehive(0, 0, 0, value, 1, value))
+            heap.meld(other)
+            self.assertEqual(stats.rebuilds, 1)
+        self.assertIsNot(heap.the_array, array)
+        self.assertNotIn("sink", vars(heap))
+        self.assertEqual(len(heap), 13)
+        self.assertEqual(heap.get_max().volume, 7)
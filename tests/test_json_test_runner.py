@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from io import StringIO
+from ed_utils.decorators import number, visibility, benchmark
+from ed_utils.timeout import timeout
+
+from ed_utils.json_test_runner import JSONTestRunner, run_test_id, run_parallel
+from unittest import mock
+
+CASES = "tests.runner_cases.RunnerCases"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_IDS = [CASES + "." + name for name in ("test_pass", "test_fail", "test_allocate", "test_sleep")]
+
+
+class JSONTestRunnerTest(unittest.TestCase):
+
+    @timeout()
+    @number("15.1")
+    def test_fields(self):
+        stream = StringIO()
+        # skipped tests, like the benchmark outside of bench runs, are left out
+        with mock.patch.dict(os.environ, {benchmark.ENV_VAR: ""}):
+            JSONTestRunner(stream=stream).run(unittest.defaultTestLoader.loadTestsFromName(CASES))
+        results = {r["name"]: r for r in json.loads(stream.getvalue())["testcases"]}
+        self.assertEqual(len(results), 4)
+        sleep = next(r for name, r in results.items() if name.startswith("0.1:"))
+        self.assertGreaterEqual(sleep["duration"], 0.05)
+        failed = next(r for name, r in results.items() if name.startswith("0.3:"))
+        self.assertFalse(failed["passed"])
+        self.assertIn("some output", failed["feedback"])
+        # memory tracking is off unless asked for
+        self.assertTrue(all("peak_memory" not in r for r in results.values()))
+
+        results = run_test_id(CASES + ".test_allocate", track_memory=True)
+        self.assertEqual(len(results), 1)
+        self.assertGreaterEqual(results[0]["peak_memory"], 4 * 1024 * 1024)
+        self.assertLess(run_test_id(CASES + ".test_pass", track_memory=True)[0]["peak_memory"], 1024 * 1024)
+
+    @timeout()
+    @number("15.2")
+    def test_run_parallel(self):
+        expected = [r for test_id in TEST_IDS for r in run_test_id(test_id)]
+        for jobs in (1, 2, 3):
+            results = run_parallel(TEST_IDS, jobs)
+            # the shards come back in the order of the test ids
+            self.assertEqual([r["name"] for r in results], [r["name"] for r in expected])
+            self.assertEqual([r["passed"] for r in results], [True, False, True, True])
+            self.assertTrue(all("duration" in r and "peak_memory" not in r for r in results))
+        results = run_parallel(TEST_IDS, 2, track_memory=True)
+        self.assertGreaterEqual(results[2]["peak_memory"], 4 * 1024 * 1024)
+        self.assertEqual(run_parallel([], 2), [])
+
+    @timeout()
+    @number("15.3")
+    def test_sharded_cli(self):
+        def run(*args):
+            out = subprocess.run([sys.executable, "run_tests.py", "-e", *args, "12"], cwd=ROOT,
+                                 capture_output=True, text=True, check=True).stdout
+            return json.loads(out)["testcases"]
+
+        def outcomes(results):
+            return [(r["name"], r["passed"]) for r in results]
+
+        # any task will do: the sharded run has to agree with the serial one
+        serial, sharded = run(), run("-j", "2")
+        self.assertGreater(len(serial), 0)
+        self.assertEqual(outcomes(sharded), outcomes(serial))
+        self.assertTrue(all("duration" in r and "peak_memory" not in r for r in serial + sharded))
+        for args in (("-m",), ("-m", "-j", "2")):
+            self.assertTrue(all("peak_memory" in r for r in run(*args)))
+
+    @timeout()
+    @number("15.4")
+    def test_benchmark_gate(self):
+        test = unittest.defaultTestLoader.loadTestsFromName(CASES + ".test_benchmark")
+        with mock.patch.dict(os.environ, {benchmark.ENV_VAR: ""}):
+            result = unittest.TestResult()
+            test(result)
+            self.assertEqual(len(result.skipped), 1)
+        with mock.patch.dict(os.environ, {benchmark.ENV_VAR: "1"}):
+            results = run_test_id(CASES + ".test_benchmark")
+            self.assertTrue(results[0]["passed"])
+            self.assertEqual(results[0]["benchmark"]["sizes"], [10, 100])
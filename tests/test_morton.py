@@ -0,0 +1,62 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from morton import MortonTree, morton_encode, morton_decode
+
+
+class TestMortonTree(unittest.TestCase):
+    TESTING_POINTS = [
+        (6, -1, -17),
+        (-11, 4, -16),
+        (5, 5, 7),
+        (-16, 2, -6),
+        (10, -20, 1),
+        (-14, 18, -4),
+        (-18, 7, 5),
+        (16, 0, -14),
+        (-6, -14, 12),
+        (4, 6, 19)
+    ]
+
+    @timeout()
+    @number("6.1")
+    def test_encode(self):
+        for point in self.TESTING_POINTS:
+            self.assertEqual(morton_decode(morton_encode(point)), point)
+        self.assertLess(morton_encode((0, 0, 0)), morton_encode((1, 1, 1)))
+        self.assertRaises(ValueError, morton_encode, (2 ** 21, 0, 0))
+
+    @timeout()
+    @number("6.2")
+    def test_get_set(self):
+        tree = MortonTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tree[point] = i
+        self.assertEqual(len(tree), 10)
+        self.assertEqual(tree[(16, 0, -14)], 7)
+        self.assertIn((4, 6, 19), tree)
+        self.assertNotIn((4, 6, 18), tree)
+        self.assertRaises(KeyError, lambda: tree[(0, 0, 0)])
+
+        tree[(16, 0, -14)] = "replaced"
+        self.assertEqual(len(tree), 10)
+        self.assertEqual(tree[(16, 0, -14)], "replaced")
+
+        bulk = MortonTree.from_points((p, i) for i, p in enumerate(self.TESTING_POINTS))
+        self.assertEqual(bulk.codes, tree.codes)
+
+    @timeout()
+    @number("6.3")
+    def test_range_query(self):
+        random.seed(3948571)
+        points = [tuple(random.randint(-40, 40) for _ in range(3)) for _ in range(2000)]
+        tree = MortonTree.from_points((p, p) for p in points)
+        for _ in range(50):
+            lo = tuple(random.randint(-45, 0) for _ in range(3))
+            hi = tuple(random.randint(0, 45) for _ in range(3))
+            expected = {p for p in points if all(lo[i] <= p[i] <= hi[i] for i in range(3))}
+            found = tree.range_query(lo, hi)
+            self.assertSetEqual({key for key, _ in found}, expected)
+            self.assertEqual(tree.range_count(lo, hi), len(expected))
@@ -1,9 +1,12 @@
+import itertools
 import random
 import unittest
-from ed_utils.decorators import number, visibility
+from ed_utils.decorators import number, visibility, benchmark
 from ed_utils.timeout import timeout
 
-from ratio import Percentiles
+from ratio import Percentiles, ApproxPercentiles, WindowedPercentiles
+from bst import PersistentBinarySearchTree
+from btree import BTree
 
 class RatioTest(unittest.TestCase):
 
@@ -39,4 +42,153 @@ class RatioTest(unittest.TestCase):
 
         p.remove_point(82)
         res = p.ratio(13, 10)
-        self.assertSetEqual(set(res), {14, 15, 16, 87, 91})
\ No newline at end of file
+        self.assertSetEqual(set(res), {14, 15, 16, 87, 91})
+
+    @timeout()
+    @number("2.3")
+    def test_percentile(self):
+        p = Percentiles()
+        for point in [4, 9, 14, 15, 16, 82, 87, 91, 92, 99]:
+            p.add_point(point)
+        self.assertEqual(p.percentile(4), 0)
+        self.assertEqual(p.percentile(15), 30)
+        self.assertEqual(p.percentile(50), 50)
+        self.assertEqual(p.ratio(50, 50), [])
+
+    @timeout()
+    @number("2.4")
+    def test_approximate(self):
+        random.seed(5019283)
+        points = random.sample(range(10 ** 6), 40000)
+        shards = [ApproxPercentiles(0.01, seed=i) for i in range(4)]
+        for i, point in enumerate(points):
+            shards[i % 4].add_point(point)
+        p = shards[0]
+        for shard in shards[1:]:
+            p.merge(shard)
+        self.assertEqual(len(p), len(points))
+        self.assertLess(p.added.size, 2000)
+
+        ordered = sorted(points)
+        for point in random.sample(points, 100):
+            self.assertLessEqual(abs(p.rank(point) - ordered.index(point)), 0.02 * len(points))
+
+        res = p.ratio(25, 25)
+        self.assertEqual(res, sorted(res))
+        self.assertLessEqual(abs(ordered.index(res[0]) - len(points) // 4), 0.02 * len(points))
+        self.assertLessEqual(abs(ordered.index(res[-1]) - 3 * len(points) // 4), 0.02 * len(points))
+
+    @timeout()
+    @number("2.5")
+    def test_window(self):
+        p = WindowedPercentiles(max_points=5, evict_batch=3)
+        for point in [50, 10, 40, 20, 30, 60, 70]:
+            p.add_point(point)
+        # the two oldest points are still pending eviction
+        self.assertEqual(len(p.our_adt), 7)
+        self.assertEqual(p.ratio(0, 0), [20, 30, 40, 60, 70])
+        self.assertEqual(len(p.our_adt), 5)
+
+        now = [0.0]
+        p = WindowedPercentiles(max_age=10, evict_batch=2, clock=lambda: now[0])
+        for point in range(10):
+            now[0] = point * 3
+            p.add_point(point)
+        self.assertEqual(p.ratio(0, 0), [6, 7, 8, 9])
+        p.remove_point(7)
+        self.assertEqual(p.ratio(0, 0), [6, 8, 9])
+        now[0] = 100
+        p.add_point(42)
+        self.assertEqual(p.ratio(0, 0), [42])
+
+    @timeout()
+    @number("2.6")
+    def test_snapshot(self):
+        p = Percentiles(backend=PersistentBinarySearchTree)
+        for point in [4, 9, 14, 15, 16, 82, 87, 91, 92, 99]:
+            p.add_point(point)
+        view = p.snapshot()
+        p.remove_point(4)
+        p.add_point(50)
+        self.assertEqual(view.ratio(0, 0), [4, 9, 14, 15, 16, 82, 87, 91, 92, 99])
+        self.assertEqual(p.ratio(0, 0), [9, 14, 15, 16, 50, 82, 87, 91, 92, 99])
+        self.assertRaises(TypeError, view.add_point, 5)
+
+        # a window is expired before it is frozen
+        w = WindowedPercentiles(max_points=3, evict_batch=10, backend=PersistentBinarySearchTree)
+        for point in range(8):
+            w.add_point(point)
+        view = w.snapshot()
+        self.assertEqual(view.ratio(0, 0), [5, 6, 7])
+        self.assertEqual(w.ratio(0, 0), [5, 6, 7])
+
+    @timeout()
+    @number("2.7")
+    def test_repeated_points(self):
+        p = Percentiles()
+        for point in [5, 1, 5, 3, 5, 2, 4, 5, 5, 0]:
+            p.add_point(point)
+        self.assertEqual(p.ratio(0, 0), [0, 1, 2, 3, 4, 5, 5, 5, 5, 5])
+        self.assertEqual(p.ratio(40, 0), [4, 5, 5, 5, 5, 5])
+        p.remove_point(5)
+        self.assertEqual(p.ratio(0, 0), [0, 1, 2, 3, 4, 5, 5, 5, 5])
+        self.assertRaises(KeyError, p.remove_point, 6)
+        self.assertRaises(KeyError, WindowedPercentiles(max_points=3).remove_point, 6)
+        self.assertEqual(len(p.our_adt), 9)
+        self.assertEqual(p.percentile(5), 5 / 9 * 100)
+
+    @timeout()
+    @number("2.8")
+    def test_btree_backend(self):
+        random.seed(1293810293)
+        p = Percentiles(backend=lambda duplicates: BTree(duplicates, fanout=4))
+        points = [4, 9, 14, 15, 16, 82, 87, 91, 92, 99, 14]
+        random.shuffle(points)
+        for point in points:
+            p.add_point(point)
+        p.remove_point(14)
+        self.assertRaises(KeyError, p.remove_point, 13)
+        res = p.ratio(13, 10)
+        self.assertSetEqual(set(res), {14, 15, 16, 82, 87, 91, 92})
+        self.assertEqual(p.percentile(16), 40)
+
+    @timeout()
+    @number("2.10")
+    def test_batch_queries(self):
+        random.seed(48291)
+        for p in [Percentiles(), Percentiles(backend=lambda duplicates: BTree(duplicates, fanout=4))]:
+            points = [random.randint(0, 99) for _ in range(300)]
+            for point in points:
+                p.add_point(point)
+            pairs = [(random.uniform(0, 60), random.uniform(0, 40)) for _ in range(20)] + [(0, 0), (60, 60)]
+            self.assertEqual(p.ratio_many(pairs), [p.ratio(x, y) for x, y in pairs])
+            self.assertEqual(p.ratio_many([(60, 60)]), [[]])
+
+            points.sort()
+            self.assertEqual(p.quantiles([0, 50, 99.5, 100, 50]),
+                             [points[0], points[149], points[298], points[299], points[149]])
+            # answers are cached until the points change
+            self.assertIs(p.cached(), p.cache)
+            p.add_point(-1)
+            self.assertEqual(p.quantiles([0]), [-1])
+            p.remove_point(-1)
+            self.assertEqual(p.quantiles([0, 100]), [points[0], points[-1]])
+            with self.assertRaises(ValueError):
+                p.quantiles([101])
+
+        w = WindowedPercentiles(max_points=10, evict_batch=100)
+        for point in range(50):
+            w.add_point(point)
+        self.assertEqual(w.quantiles([0, 100]), [40, 49])
+
+    @timeout()
+    @number("2.9")
+    @benchmark(sizes=[1000, 4000, 16000, 64000], repeat=5, bound="log n")
+    def test_percentile_scaling(self, n):
+        random.seed(n)
+        p = Percentiles()
+        points = random.sample(range(10 * n), n)
+        for point in points:
+            p.add_point(point)
+        queries = itertools.cycle(random.sample(points, 256))
+        return lambda: p.percentile(next(queries))
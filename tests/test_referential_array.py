@@ -0,0 +1,89 @@
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from referential_array import ArrayR, TypedArrayR
+
+
+class ArrayRTest(unittest.TestCase):
+
+    @timeout()
+    @number("9.1")
+    def test_bulk(self):
+        a = ArrayR(6)
+        self.assertEqual(a[:], [None] * 6)
+        a[1:4] = ["a", "b", "c"]
+        self.assertEqual(a[0:5], [None, "a", "b", "c", None])
+        a.fill(0, 4)
+        self.assertEqual(a[:], [None, "a", "b", "c", 0, 0])
+
+        b = ArrayR(4)
+        b.copy_from(a, 1, 0, 3)
+        self.assertEqual(b[:], ["a", "b", "c", None])
+        a.copy_from(a, 1, 2, 3)
+        self.assertEqual(a[:], [None, "a", "a", "b", "c", 0])
+        self.assertRaises(IndexError, b.copy_from, a, 4, 0, 3)
+
+    @timeout()
+    @number("9.2")
+    def test_view(self):
+        a = ArrayR(6)
+        a[:] = list(range(6))
+        v = a.view(2, 5)
+        self.assertEqual(len(v), 3)
+        self.assertEqual(v[0], 2)
+        self.assertEqual(v[-1], 4)
+        self.assertEqual(v[:], [2, 3, 4])
+        self.assertRaises(IndexError, v.__getitem__, 3)
+        # reversed and stepped slices stay inside the view
+        self.assertEqual(v[::-1], [4, 3, 2])
+        self.assertEqual(v[-1:0:-1], [4, 3])
+        self.assertEqual(v[::-2], [4, 2])
+        self.assertEqual(a.view(0, 4)[::-1], [3, 2, 1, 0])
+        self.assertEqual(v[1:1:-1], [])
+        v[::-1] = [2, 3, 4]
+        self.assertEqual(a[:], [0, 1, 4, 3, 2, 5])
+        v[::-1] = [4, 3, 2]
+
+        v[1] = "x"
+        self.assertEqual(a[3], "x")
+        v.fill(None, 2)
+        self.assertEqual(a[:], [0, 1, 2, "x", None, 5])
+        w = v.view(1)
+        self.assertEqual(w[:], ["x", None])
+        b = ArrayR(3)
+        b[:] = v
+        self.assertEqual(b[:], [2, "x", None])
+
+    @timeout()
+    @number("9.3")
+    def test_typed(self):
+        a = TypedArrayR(5)
+        self.assertEqual(a[:], [0] * 5)
+        a[1:4] = [7, 8, 9]
+        a.copy_from(a, 1, 2, 3)
+        self.assertEqual(a[:], [0, 7, 7, 8, 9])
+        v = a.view(3)
+        v[0] = -1
+        self.assertEqual(a[3], -1)
+
+        f = TypedArrayR(3, "float64")
+        f.fill(0.5)
+        f.copy_from(a, 0, 1, 2)
+        self.assertEqual(f[:], [0.5, 0.0, 7.0])
+        mv = f.memoryview()
+        self.assertEqual((mv.format, mv.itemsize, len(mv)), ("d", 8, 3))
+        mv[0] = 2.5
+        self.assertEqual(f[0], 2.5)
+        self.assertRaises(ValueError, TypedArrayR, 3, "int8")
+
+        # out of range values raise instead of wrapping around
+        a[0], a[1] = 2 ** 63 - 1, -2 ** 63
+        self.assertRaises(OverflowError, a.__setitem__, 2, 2 ** 63)
+        self.assertRaises(OverflowError, a.__setitem__, slice(2, 4), [1, -2 ** 63 - 1])
+        self.assertRaises(OverflowError, a.fill, 2 ** 64)
+        self.assertRaises(OverflowError, v.fill, 2 ** 64)
+        b = ArrayR(2)
+        b[:] = [5, 2 ** 63]
+        self.assertRaises(OverflowError, a.copy_from, b, 0, 0, 2)
+        self.assertEqual(a[:], [2 ** 63 - 1, -2 ** 63, 7, -1, 9])
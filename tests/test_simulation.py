@@ -0,0 +1,70 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from beehive import Beehive, BeehiveSelector
+from simulation import HarvestSimulation
+
+
+def make_hives(n, seed):
+    rng = random.Random(seed)
+    return [Beehive(i, 0, 0, capacity=rng.randint(1, 50), nutrient_factor=rng.randint(1, 9),
+                    volume=rng.randint(0, 200)) for i in range(n)]
+
+
+class TestHarvestSimulation(unittest.TestCase):
+
+    @timeout()
+    @number("14.1")
+    def test_matches_tick_loop(self):
+        # 10 days of minutes: 3 harvesters every hour, every hive refilled daily
+        selector = BeehiveSelector(0)
+        selector.set_all_beehives(make_hives(200, 1))
+        expected = []
+        for tick in range(10 * 1440):
+            if tick % 1440 == 0 and tick:
+                for hive in selector.beehives():
+                    hive.volume += 20
+                selector.set_all_beehives(selector.beehives())
+            if tick % 60 == 0:
+                expected.extend(selector.harvest_many(3))
+
+        selector = BeehiveSelector(0)
+        selector.set_all_beehives(make_hives(200, 1))
+        batches = []
+        simulation = HarvestSimulation(selector, on_harvest=lambda time, values: batches.append((time, values)))
+        simulation.harvest(0, 3, every=60)
+        simulation.refill(1440, 20, every=1440)
+        total = simulation.run(10 * 1440 - 1)
+        self.assertEqual([value for _, batch in batches for value in batch], expected)
+        self.assertEqual(total, sum(expected))
+        # one batch per hour, and only the events themselves were handled
+        self.assertEqual(len(batches), 240)
+        self.assertEqual(simulation.handled, 240 + 9)
+        self.assertEqual(simulation.now, 10 * 1440 - 1)
+
+    @timeout()
+    @number("14.2")
+    def test_add_remove_refill(self):
+        a = Beehive(0, 0, 0, capacity=10, nutrient_factor=1, volume=10)
+        b = Beehive(1, 0, 0, capacity=10, nutrient_factor=2, volume=10)
+        c = Beehive(2, 0, 0, capacity=10, nutrient_factor=5, volume=10)
+        simulation = HarvestSimulation()
+        simulation.add_beehive(0, a)
+        simulation.add_beehive(0, b)
+        simulation.harvest(1, 2)
+        self.assertEqual(simulation.run(1), 20 + 10)
+        self.assertEqual(simulation.run(), 0)
+
+        simulation.add_beehive(5, c)
+        simulation.remove_beehive(5, b)
+        simulation.refill(5, 4, a)
+        simulation.harvest(5, 3)
+        simulation.harvest(9, 1)
+        self.assertEqual(simulation.step(), [50, 4, 0])
+        self.assertEqual(len(simulation.selector), 2)
+        self.assertEqual(simulation.run(), 0)
+        self.assertEqual(simulation.harvested, 30 + 54)
+        with self.assertRaises(ValueError):
+            simulation.harvest(1)
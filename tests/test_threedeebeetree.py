@@ -1,8 +1,12 @@
+import itertools
+import random
+import threading
 import unittest
-from ed_utils.decorators import number, visibility
+from ed_utils.decorators import number, visibility, benchmark
 from ed_utils.timeout import timeout
 
-from threedeebeetree import ThreeDeeBeeTree
+import threedeebeetree
+from threedeebeetree import ThreeDeeBeeTree, PARALLEL_THRESHOLD
 
 
 class TestThreeDeeBeeTree(unittest.TestCase):
@@ -63,3 +67,72 @@ class TestThreeDeeBeeTree(unittest.TestCase):
 
         self.assertEqual(tdbt.get_tree_node_by_key((16, 0, -14)).item, 7)
         self.assertEqual(tdbt.get_tree_node_by_key((6, -1, -17)).item, 0)
+
+    @timeout()
+    @number("3.4")
+    def test_range_count(self):
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tdbt[point] = i
+
+        for lo, hi in [((-20, -20, -20), (20, 20, 20)), ((0, -5, -20), (20, 10, 20)), ((-5, -5, -5), (5, 5, 5))]:
+            expected = sum(all(lo[i] <= p[i] <= hi[i] for i in range(3)) for p in self.TESTING_POINTS)
+            self.assertEqual(tdbt.range_count(lo, hi), expected)
+
+    @timeout()
+    @number("3.5")
+    def test_batches(self):
+        random.seed(8120398)
+        points = list({tuple(random.randint(-500, 500) for _ in range(3)) for _ in range(3000)})
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(points):
+            tdbt[point] = i
+
+        keys = random.sample(points, 2500)
+        self.assertEqual(tdbt.get_many(keys, workers=2), [tdbt[key] for key in keys])
+        self.assertRaises(KeyError, tdbt.get_many, keys + [(999, 999, 999)], workers=2)
+
+        boxes = []
+        for _ in range(PARALLEL_THRESHOLD):
+            lo = tuple(random.randint(-500, 400) for _ in range(3))
+            boxes.append((lo, tuple(v + 100 for v in lo)))
+        self.assertEqual(tdbt.range_count_many(boxes, workers=2), [tdbt.range_count(lo, hi) for lo, hi in boxes])
+
+        # the snapshot is shared by the batches until the next insert
+        snapshot = tdbt.snapshot
+        self.assertIsNotNone(snapshot)
+        tdbt.get_many(keys, workers=2)
+        self.assertIs(tdbt.snapshot, snapshot)
+        tdbt[(999, 999, 999)] = -1
+        self.assertIsNone(tdbt.snapshot)
+        self.assertFalse(snapshot.release.alive)
+        self.assertEqual(tdbt.get_many(keys + [(999, 999, 999)], workers=2)[-1], -1)
+        self.assertEqual(tdbt.range_count_many(boxes, workers=2), [tdbt.range_count(lo, hi) for lo, hi in boxes])
+
+        # concurrent batches share a single pool
+        threedeebeetree._get_pool(3)
+        pools, results = [], []
+
+        def batch():
+            pools.append(threedeebeetree._get_pool(2))
+            results.append(tdbt.get_many(keys, workers=2))
+
+        threads = [threading.Thread(target=batch) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(pool) for pool in pools}), 1)
+        self.assertEqual(results, [[tdbt[key] for key in keys]] * 4)
+
+    @timeout()
+    @number("3.6")
+    @benchmark(sizes=[1000, 4000, 16000, 64000], repeat=5, bound="log n")
+    def test_lookup_scaling(self, n):
+        random.seed(n)
+        points = list({tuple(random.randint(-10 ** 6, 10 ** 6) for _ in range(3)) for _ in range(n)})
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(points):
+            tdbt[point] = i
+        keys = itertools.cycle(random.sample(points, 256))
+        return lambda: tdbt[next(keys)]
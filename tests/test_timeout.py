@@ -0,0 +1,61 @@
+import os
+import tempfile
+import time
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+
+class Unpicklable(Exception):
+
+    def __init__(self):
+        super().__init__("cannot cross the pipe")
+        self.callback = lambda: None
+
+
+class TimeoutProcessTest(unittest.TestCase):
+
+    @timeout()
+    @number("16.1")
+    def test_kills_on_timeout(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pid")
+
+            @timeout(1, mode="process")
+            def spin():
+                with open(path, "w") as f:
+                    f.write(str(os.getpid()))
+                while True:
+                    pass
+
+            start = time.perf_counter()
+            self.assertRaises(TimeoutError, spin)
+            self.assertLess(time.perf_counter() - start, 3)
+            with open(path) as f:
+                pid = int(f.read())
+        # the child was killed and reaped, not left spinning
+        self.assertRaises(ProcessLookupError, os.kill, pid, 0)
+
+    @timeout()
+    @number("16.2")
+    def test_results_and_exceptions(self):
+        @timeout(10, mode="process")
+        def run(kind):
+            if kind == "value":
+                return {"pid": os.getpid(), "values": [1, 2, 3]}
+            if kind == "assertion":
+                assert 1 == 2, "one is not two"
+            if kind == "unpicklable":
+                raise Unpicklable()
+            os._exit(3)
+
+        result = run("value")
+        self.assertEqual(result["values"], [1, 2, 3])
+        self.assertNotEqual(result["pid"], os.getpid())
+        with self.assertRaisesRegex(AssertionError, "one is not two"):
+            run("assertion")
+        with self.assertRaisesRegex(RuntimeError, "Unpicklable"):
+            run("unpicklable")
+        with self.assertRaisesRegex(RuntimeError, "exited with code 3"):
+            run("exit")
+        self.assertRaises(ValueError, timeout, 1, "fiber")
@@ -0,0 +1,40 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from treesort import treesort, parallel_treesort, PARALLEL_THRESHOLD
+
+
+class TreesortTest(unittest.TestCase):
+
+    @timeout()
+    @number("7.1")
+    def test_duplicates(self):
+        random.seed(9128374)
+        array = [random.randint(0, 50) for _ in range(500)]
+        self.assertEqual(treesort(array), sorted(array))
+        self.assertEqual(treesort([]), [])
+
+    @timeout()
+    @number("7.2")
+    def test_parallel(self):
+        random.seed(4410913)
+        array = [random.randint(0, 1000) for _ in range(5000)]
+        result = parallel_treesort(array, workers=3, threshold=0)
+        self.assertNotIsInstance(result, list)
+        self.assertEqual(list(result), sorted(array))
+        # below the threshold, or with one worker, no pool is started
+        self.assertEqual(list(parallel_treesort(array, workers=3)), sorted(array))
+        self.assertEqual(list(parallel_treesort(array, workers=1, threshold=0)), sorted(array))
+        self.assertEqual(list(parallel_treesort([], workers=3, threshold=0)), [])
+
+    @timeout()
+    @number("7.3")
+    def test_parallel_sorted(self):
+        # presorted chunks are far longer than the recursion limit
+        array = list(range(PARALLEL_THRESHOLD + 20000))
+        self.assertEqual(list(parallel_treesort(array, workers=2)), array)
+        nearly = array[::-1]
+        nearly[10], nearly[-10] = nearly[-10], nearly[10]
+        self.assertEqual(list(parallel_treesort(nearly, workers=1, threshold=0)), array)
@@ -1,9 +1,21 @@
 from __future__ import annotations
-from typing import Generic, TypeVar, Tuple
+import threading
+from typing import Generic, TypeVar, Tuple, List, Iterable
 from dataclasses import dataclass, field
 
 I = TypeVar('I')
 Point = Tuple[int, int, int]
+Box = Tuple[Point, Point]
+
+# flattened node layout: x, y, z, subtree_size, then the index of oct1..oct8 (-1 if empty)
+NODE_WIDTH = 12
+OCT_NAMES = ['oct1', 'oct2', 'oct3', 'oct4', 'oct5', 'oct6', 'oct7', 'oct8']
+# octant number (1-8) indexed by 4*(key.x < p.x) + 2*(key.y < p.y) + (key.z < p.z)
+OCTANT = [8, 7, 5, 6, 3, 2, 4, 1]
+# batches smaller than this are answered in-process: with the snapshot and the pool
+# already up, a batch costs about 0.25ms of fixed overhead and saves about 2us per
+# lookup on 2 workers (200k nodes), which breaks even near 130 lookups
+PARALLEL_THRESHOLD = 256
 
 @dataclass
 class BeeNode:
@@ -52,6 +64,8 @@ class ThreeDeeBeeTree(Generic[I]):
         """
         self.root = None
         self.length = 0
+        # shared-memory copy of the tree used by batch lookups, dropped on every insert
+        self.snapshot = None
 
     def is_empty(self) -> bool:
         """
@@ -114,6 +128,9 @@ class ThreeDeeBeeTree(Generic[I]):
 
 
     def __setitem__(self, key: Point, item: I) -> None:
+        if self.snapshot is not None:
+            self.snapshot.release()
+            self.snapshot = None
         self.root = self.insert_aux(self.root, key, item)
 
     def insert_aux(self, current: BeeNode, key: Point, item: I) -> BeeNode:
@@ -153,6 +170,93 @@ class ThreeDeeBeeTree(Generic[I]):
 
         return current
 
+    def range_count(self, lo: Point, hi: Point) -> int:
+        """
+            Counts the points inside the box lo <= point <= hi (inclusive on every axis).
+            Subtrees whose region lies entirely inside the box are counted by subtree_size.
+            Complexity:
+            Best Case: O(1) when the box covers the whole tree
+            Worst Case: O(N) where N is the number of nodes in the tree
+        """
+        return _range_count(self.root, lo, hi, lambda node, octant: getattr(node, OCT_NAMES[octant]),
+                            lambda node: node.key, lambda node: node.subtree_size)
+
+    def flatten(self) -> Tuple[array, list]:
+        """
+            Flattens the tree into a preorder array of NODE_WIDTH signed 64 bit integers
+            per node (the root is node 0), along with the items in the same order.
+            Complexity:
+            Best Case: O(N) where N is the number of nodes in the tree
+            Worst Case: O(N) Same as best case
+        """
+        from array import array
+        data = array('q')
+        items = []
+        if self.root is None:
+            return data, items
+        stack = [(self.root, -1)]
+        while stack:
+            node, slot = stack.pop()
+            index = len(items)
+            if slot >= 0:
+                data[slot] = index
+            items.append(node.item)
+            data.extend(node.key)
+            data.append(node.subtree_size)
+            data.extend([-1] * 8)
+            for octant in range(7, -1, -1):
+                child = getattr(node, OCT_NAMES[octant])
+                if child is not None:
+                    stack.append((child, index * NODE_WIDTH + 4 + octant))
+        return data, items
+
+    def shared_snapshot(self) -> SharedSnapshot:
+        """
+            Returns the flattened tree published in shared memory for the batch
+            workers, building it on the first batch after a change to the tree.
+            Complexity:
+            Best Case: O(1) when the tree has not changed since the last batch
+            Worst Case: O(N) where N is the number of nodes in the tree
+        """
+        if self.snapshot is None:
+            self.snapshot = SharedSnapshot(*self.flatten())
+        return self.snapshot
+
+    def get_many(self, keys: Iterable[Point], workers: int | None = None) -> List[I]:
+        """
+            Looks up every key, raising KeyError for the first missing one.
+            Large batches are split across a process pool whose workers search a
+            shared-memory snapshot of the tree, so the tree itself is never pickled.
+            The snapshot and the pool are kept across batches until the tree changes.
+            Complexity: O(K * D) where K is the number of keys and D the depth of the
+            tree, divided across the workers, plus O(N) for the first batch after a change
+        """
+        keys = [tuple(key) for key in keys]
+        workers = _worker_count(workers)
+        if self.root is None or workers == 1 or len(keys) < PARALLEL_THRESHOLD:
+            return [self[key] for key in keys]
+        snapshot = self.shared_snapshot()
+        indices = _run_on_snapshot(snapshot.name, _lookup_chunk, keys, workers)
+        result = []
+        for key, index in zip(keys, indices):
+            if index < 0:
+                raise KeyError('Key not found: {0}'.format(key))
+            result.append(snapshot.items[index])
+        return result
+
+    def range_count_many(self, boxes: Iterable[Box], workers: int | None = None) -> List[int]:
+        """
+            Answers range_count for every (lo, hi) box in the batch.
+            Large batches are split across a process pool as in get_many.
+            Complexity: O(B * Q) where B is the number of boxes and Q the cost of one
+            range_count, divided across the workers, plus O(N) for the first batch after a change
+        """
+        boxes = [(tuple(lo), tuple(hi)) for lo, hi in boxes]
+        workers = _worker_count(workers)
+        if self.root is None or workers == 1 or len(boxes) < PARALLEL_THRESHOLD:
+            return [self.range_count(lo, hi) for lo, hi in boxes]
+        return _run_on_snapshot(self.shared_snapshot().name, _range_count_chunk, boxes, workers)
+
     def is_leaf(self, current: BeeNode) -> bool:
         """ Simple check whether or not the node is a leaf.
             Complexity:
@@ -170,6 +274,157 @@ class ThreeDeeBeeTree(Generic[I]):
                 current.oct8 is None
         )
 
+def _range_count(root, lo: Point, hi: Point, child, key, size) -> int:
+    """
+        Iterative box count shared by the linked and the flattened trees.
+        Each stack entry carries the region (per axis inclusive bounds) its subtree can hold.
+    """
+    inf = float('inf')
+    count = 0
+    stack = [(root, -inf, inf, -inf, inf, -inf, inf)]
+    while stack:
+        node, x0, x1, y0, y1, z0, z1 = stack.pop()
+        if node is None or x0 > hi[0] or x1 < lo[0] or y0 > hi[1] or y1 < lo[1] or z0 > hi[2] or z1 < lo[2]:
+            continue
+        if lo[0] <= x0 and x1 <= hi[0] and lo[1] <= y0 and y1 <= hi[1] and lo[2] <= z0 and z1 <= hi[2]:
+            count += size(node)
+            continue
+        kx, ky, kz = key(node)
+        if lo[0] <= kx <= hi[0] and lo[1] <= ky <= hi[1] and lo[2] <= kz <= hi[2]:
+            count += 1
+        # octants 1-4 hold larger x, octants 1, 4, 5, 6 larger y and 1, 2, 6, 7 larger z
+        for octant in range(8):
+            px, py, pz = octant < 4, octant in (0, 3, 4, 5), octant in (0, 1, 5, 6)
+            stack.append((
+                child(node, octant),
+                max(x0, kx + 1) if px else x0, x1 if px else min(x1, kx),
+                max(y0, ky + 1) if py else y0, y1 if py else min(y1, ky),
+                max(z0, kz + 1) if pz else z0, z1 if pz else min(z1, kz),
+            ))
+    return count
+
+
+def _worker_count(workers: int | None) -> int:
+    """ Number of pool workers to use, defaulting to the number of CPUs. """
+    if workers is None:
+        import os
+        workers = os.cpu_count() or 1
+    return max(1, workers)
+
+
+class SharedSnapshot:
+    """
+        A flattened tree published in shared memory under name, along with its items.
+        The block is unlinked by release(), or at the latest when the snapshot is
+        garbage collected or the interpreter exits. Its memory is only freed once the
+        pool workers have unmapped it too, see _attach_snapshot.
+    """
+
+    def __init__(self, data: array, items: list) -> None:
+        from multiprocessing import shared_memory
+        import weakref
+        self.items = items
+        size = len(data) * data.itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        shm.buf[:size] = data.tobytes()
+        self.name = shm.name
+        self.release = weakref.finalize(self, _unlink, shm)
+
+
+def _unlink(shm) -> None:
+    shm.close()
+    shm.unlink()
+
+
+# the batch pool, kept across batches and trees, and its number of workers
+_pool = None
+_pool_workers = 0
+# guards _pool, so that concurrent batches never start two pools and leak one
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int):
+    """ Returns the batch pool, starting it on first use or when the worker count changes. """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            from concurrent.futures import ProcessPoolExecutor
+            if _pool is not None:
+                # waits for the batches already submitted to the old pool
+                _pool.shutdown()
+            _pool, _pool_workers = ProcessPoolExecutor(max_workers=workers), workers
+        return _pool
+
+
+# the shared-memory snapshot a pool worker is attached to
+_snapshot = None
+
+
+def _attach_snapshot(name: str) -> None:
+    """
+        Maps the flattened tree published under name, unless the worker already has it.
+        A worker only learns that its snapshot is stale from the next task, so the
+        mapping of a released snapshot is dropped here, when the name changes.
+        Until then (or until the pool shuts down) that memory stays committed, even
+        though the block is already unlinked.
+    """
+    global _snapshot
+    if _snapshot is not None and _snapshot.name == name:
+        return
+    from multiprocessing import shared_memory
+    if _snapshot is not None:
+        _snapshot.close()
+    _snapshot = shared_memory.SharedMemory(name=name)
+
+
+def _flat_child(data, node: int, octant: int):
+    child = data[node * NODE_WIDTH + 4 + octant]
+    return None if child < 0 else child
+
+
+def _lookup_chunk(name: str, keys: List[Point]) -> List[int]:
+    """ Worker task: node index of every key in the snapshot, or -1 when missing. """
+    _attach_snapshot(name)
+    data = _snapshot.buf.cast('q')
+    result = []
+    for key in keys:
+        node = 0
+        while node >= 0:
+            base = node * NODE_WIDTH
+            nx, ny, nz = data[base], data[base + 1], data[base + 2]
+            if (nx, ny, nz) == key:
+                break
+            node = data[base + 4 + OCTANT[4 * (nx < key[0]) + 2 * (ny < key[1]) + (nz < key[2])] - 1]
+        result.append(node)
+    data.release()
+    return result
+
+
+def _range_count_chunk(name: str, boxes: List[Box]) -> List[int]:
+    """ Worker task: range_count of every box against the snapshot. """
+    _attach_snapshot(name)
+    data = _snapshot.buf.cast('q')
+    result = [
+        _range_count(0, lo, hi, lambda node, octant: _flat_child(data, node, octant),
+                     lambda node: tuple(data[node * NODE_WIDTH:node * NODE_WIDTH + 3]),
+                     lambda node: data[node * NODE_WIDTH + 3])
+        for lo, hi in boxes
+    ]
+    data.release()
+    return result
+
+
+def _run_on_snapshot(name: str, task, batch: list, workers: int) -> list:
+    """
+        Splits batch into one chunk per worker, runs task on every chunk against
+        the snapshot published under name and concatenates the results in order.
+    """
+    step = -(-len(batch) // workers)
+    chunks = [batch[i:i + step] for i in range(0, len(batch), step)]
+    pool = _get_pool(workers)
+    return [value for chunk in pool.map(task, [name] * len(chunks), chunks) for value in chunk]
+
+
 if __name__ == "__main__":
     tdbt = ThreeDeeBeeTree()
     tdbt[(3, 3, 3)] = "A"
@@ -1,6 +1,13 @@
+from __future__ import annotations
 
-from bst import BinarySearchTree
-from typing import List
+from bst import BinarySearchTree, DUPLICATES_COUNT
+from heapq import merge
+from random import Random
+from typing import List, Iterator
+
+# inputs shorter than this are sorted in-process: below it, starting a pool
+# and shipping the chunks costs more than it saves
+PARALLEL_THRESHOLD = 100_000
 
 def treesort(array: List[int]) -> List[int]:
     """ Simple Tree Sort implementation.
@@ -8,7 +15,8 @@ def treesort(array: List[int]) -> List[int]:
         2. Traverses the tree in-order.
     """
     ## in each tree sort we need a new tree or we cannot add anyhting
-    tree = BinarySearchTree()
+    ## repeated values are counted on their node rather than rejected
+    tree = BinarySearchTree(DUPLICATES_COUNT)
 
     for v in array: ##insert al elements from tree as needed, this insertion also handles the operations of BST
         tree[v] = v # <v,v> key value pairs, this magic method adds all elements to true
@@ -22,9 +30,44 @@ def treesort(array: List[int]) -> List[int]:
 
     return new_array
 
+def _treesort_chunk(chunk: List[int]) -> List[int]:
+    """ Worker task: tree-sorts one chunk, inserting it in a shuffled order.
+        The tree is not balanced, so a presorted chunk inserted as is would build
+        a chain: O(N^2) time and a recursion as deep as the chunk is long.
+        Shuffled, the tree has O(log N) expected depth whatever the input order.
+    """
+    chunk = list(chunk)
+    Random(len(chunk)).shuffle(chunk)
+    return treesort(chunk)
+
+def parallel_treesort(array: List[int], workers: int | None = None,
+                      threshold: int = PARALLEL_THRESHOLD) -> Iterator[int]:
+    """ Tree Sort over a pool of processes, streaming the sorted values.
+        1. Splits the array into one chunk per worker.
+        2. Tree-sorts each chunk in a ProcessPoolExecutor worker.
+        3. Merges the sorted runs with a heap (heapq.merge), yielding the values in order.
+        Arrays shorter than threshold, or a single worker (the default on a
+        single-CPU machine), are tree-sorted in-process instead.
+        Each chunk is inserted in a shuffled order, so sorted and nearly sorted
+        inputs cost the same as random ones.
+        Complexity: O(N log N / W + N log W) expected for W workers, plus O(N) to ship the chunks
+    """
+    if workers is None:
+        import os
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(array) < max(threshold, 2):
+        yield from _treesort_chunk(array)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunk_size = -(-len(array) // workers)
+    chunks = [array[i:i + chunk_size] for i in range(0, len(array), chunk_size)]
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        runs = list(pool.map(_treesort_chunk, chunks))
+    yield from merge(*runs)
+
 if __name__ == '__main__':
     array = [int(v) for v in input('Enter sequence: ').strip().split()]
     print(' '.join([str(v) for v in treesort(array)]))
 
-    # remember that duplicate elements are not allowed by our BST insertion!
-